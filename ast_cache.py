@@ -0,0 +1,200 @@
+"""
+ast_cache.py - On-Disk Cache of Parsed Programs
+
+Saves the AST of a source file so running the same program again skips
+tokenizing and parsing, much like CPython's __pycache__. Entries are keyed by
+a hash of the source text, so an edited file simply misses. Each entry also
+records a stamp of the modules that produce the AST (tokenizer, parser and
+the constant folder's operators); changing any of them invalidates every
+entry, the way a .pyc's magic number does.
+
+The cache lives in $TLANG_CACHE_DIR, or else in tlang/ under
+$XDG_CACHE_HOME (~/.cache). Failing to read or write the cache never fails
+a run; the program is just parsed as usual. The runner only uses it when
+asked to (--cache).
+
+Loading an entry unpickles it, which can run arbitrary code, so entries are
+written readable by their owner only, and an entry is only loaded if it
+belongs to the current user and no one else can write to it. At most
+MAX_ENTRIES entries are kept; storing one more evicts the oldest.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Optional, Tuple
+
+import tokenizer
+import parser
+import operators
+from parser import Node
+
+# Bump when the entry format changes
+CACHE_VERSION = 1
+
+# Most entries kept in the cache directory
+MAX_ENTRIES = 256
+
+
+def cache_dir() -> str:
+    """The directory holding cache entries."""
+    directory = os.environ.get('TLANG_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'tlang')
+
+
+def _stamp() -> Tuple:
+    """Identify the code that produced an AST; entries with another stamp are stale."""
+    files = []
+    for module in (tokenizer, parser, operators):
+        stat = os.stat(module.__file__)
+        files.append((stat.st_mtime_ns, stat.st_size))
+    return (CACHE_VERSION, sys.version_info[:2], tuple(files))
+
+
+def _entry_path(source: str, directory: Optional[str]) -> str:
+    key = hashlib.blake2b(source.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+    return os.path.join(directory or cache_dir(), key + '.pkl')
+
+
+def _trusted(fd: int) -> bool:
+    """Whether an open entry is ours and writable by no one else."""
+    stat = os.fstat(fd)
+    getuid = getattr(os, 'getuid', None)
+    if getuid is not None and stat.st_uid != getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+
+def load(source: str, directory: Optional[str] = None) -> Optional[Node]:
+    """
+    Get the cached AST of source.
+
+    Returns:
+        The AST, or None if there is no valid entry
+    """
+    try:
+        with open(_entry_path(source, directory), 'rb') as f:
+            # Check the file actually opened, so it cannot be swapped after
+            if not _trusted(f.fileno()):
+                return None
+            stamp, ast = pickle.load(f)
+    except Exception:
+        # Missing, unreadable or corrupt entries are all just misses
+        return None
+    if stamp != _stamp():
+        return None
+    return ast
+
+
+def store(source: str, ast: Node, directory: Optional[str] = None) -> bool:
+    """
+    Cache the AST of source. Evaluation only annotates the AST with slots,
+    which are recomputed on every run, so it may be stored before or after.
+
+    Returns:
+        True if the entry was written
+    """
+    path = _entry_path(source, directory)
+    try:
+        data = pickle.dumps((_stamp(), ast), pickle.HIGHEST_PROTOCOL)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # Write to a temporary file (mkstemp makes it owner-only) and rename
+        # it into place, so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, pickle.PicklingError, RecursionError):
+        return False
+    _evict(os.path.dirname(path))
+    return True
+
+
+def _evict(directory: str):
+    """Remove the oldest entries until at most MAX_ENTRIES remain."""
+    try:
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith('.pkl'):
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+        if len(entries) <= MAX_ENTRIES:
+            return
+        entries.sort()
+        for mtime, path in entries[:len(entries) - MAX_ENTRIES]:
+            os.unlink(path)
+    except OSError:
+        pass
+
+
+# Test functions
+def test_round_trip():
+    source = "x = 1 + 2\nwhile (x < 10) { x = x * 2 }"
+    with tempfile.TemporaryDirectory() as directory:
+        assert load(source, directory) is None
+        assert store(source, parser.parse(source), directory)
+        ast = load(source, directory)
+        assert repr(ast) == repr(parser.parse(source))
+        assert load(source + " ", directory) is None
+    print("✓ test_round_trip passed")
+
+
+def test_stale_entry():
+    source = "print 1"
+    with tempfile.TemporaryDirectory() as directory:
+        with open(_entry_path(source, directory), 'wb') as f:
+            pickle.dump(((0,), parser.parse(source)), f)
+        assert load(source, directory) is None
+        with open(_entry_path(source, directory), 'wb') as f:
+            f.write(b'not a pickle')
+        assert load(source, directory) is None
+    print("✓ test_stale_entry passed")
+
+
+def test_untrusted_entry():
+    source = "print 1"
+    with tempfile.TemporaryDirectory() as directory:
+        assert store(source, parser.parse(source), directory)
+        path = _entry_path(source, directory)
+        if os.name == 'posix':
+            assert os.stat(path).st_mode & 0o777 == 0o600
+        # An entry others can write to is never unpickled
+        os.chmod(path, 0o666)
+        assert load(source, directory) is None
+        os.chmod(path, 0o600)
+        assert load(source, directory) is not None
+    print("✓ test_untrusted_entry passed")
+
+
+def test_eviction():
+    global MAX_ENTRIES
+    saved, MAX_ENTRIES = MAX_ENTRIES, 3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            sources = [f"print {i}" for i in range(5)]
+            for i, source in enumerate(sources):
+                assert store(source, parser.parse(source), directory)
+                # Distinct, increasing modification times
+                os.utime(_entry_path(source, directory), ns=(i * 10**9, i * 10**9))
+            assert len(os.listdir(directory)) == 3
+            assert [load(source, directory) is not None for source in sources] == \
+                [False, False, True, True, True]
+    finally:
+        MAX_ENTRIES = saved
+    print("✓ test_eviction passed")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_stale_entry()
+    test_untrusted_entry()
+    test_eviction()
+    print("\nAll AST cache tests passed!")
@@ -0,0 +1,420 @@
+"""
+codegen.py - Python Code Generation
+
+An alternative to the bytecode interpreter: translates a resolved AST into
+the source of one Python function and compiles it with the built-in
+compile(), so programs run on CPython's own evaluation loop.
+
+Variables become locals of the generated function (``v<slot>``), loaded from
+the environment's slot list on entry and written back on exit, even when the
+program fails part way. A variable that was never assigned is simply an
+unbound local, so reading it raises UnboundLocalError. The generated code
+uses the same operator functions as the evaluator (operators.py) wherever
+Python's own operator would differ ('+' on strings, '/' by zero); language
+truthiness matches Python's for every value the language has, so 'if',
+'while', '&&', '||' and '!' map to Python directly.
+
+Every expression that can fail is recorded by its position in the generated
+source, so an error can be traced back to the node, and the source location,
+it came from (see PythonProgram.node_at).
+"""
+
+import math
+from types import CodeType, TracebackType
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Callable
+
+from parser import (
+    parse, Node, ProgramNode, BlockNode, AssignNode, PrintNode, IfNode, WhileNode,
+    BreakNode, ContinueNode,
+    BinaryNode, UnaryNode, LiteralNode, IdentifierNode,
+)
+from resolver import Resolver, UNSET
+from loop_opt import CountedLoopNode, IncrementNode
+from operators import add, divide
+
+# Errors are traced back to nodes by the column positions of the generated
+# code (CodeType.co_positions), which Python has from 3.11; earlier versions
+# run programs in the bytecode evaluator instead.
+CODEGEN_AVAILABLE = hasattr(CodeType, 'co_positions')
+
+
+# Binary operators written as Python operators; '+' and '/' call functions
+PYTHON_OPERATORS = {
+    '-': '-', '*': '*', '%': '%',
+    '==': '==', '!=': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>=',
+    '&&': 'and', '||': 'or',
+}
+
+OPERATOR_FUNCTIONS = {
+    '+': 'add',
+    '/': 'divide',
+}
+
+UNARY_PYTHON_OPERATORS = {
+    '-': '-',
+    '!': 'not ',
+}
+
+
+class CodegenError(Exception):
+    """Exception raised for AST nodes that have no Python translation."""
+    def __init__(self, message: str, node: Node):
+        self.node = node
+        super().__init__(message)
+
+
+class PythonProgram:
+    """
+    A program compiled to a Python function.
+
+    ``function(values, print_value)`` runs the program against the slot list
+    ``values`` (whose slots must follow ``names``) and returns its result.
+    """
+
+    def __init__(self, source: str, function: Callable[[List[Any], Callable[[Any], None]], Any],
+                 names: Tuple[str, ...], spans: Dict[Tuple[int, int, int], Node]):
+        self.source = source
+        self.function = function
+        self.names = names
+        self._spans = spans
+
+    def node_at(self, traceback: Optional[TracebackType]) -> Optional[Node]:
+        """Find the node whose generated code raised the exception with this traceback."""
+        code: CodeType = self.function.__code__
+        frame_tb = None
+        while traceback is not None:
+            if traceback.tb_frame.f_code is code:
+                frame_tb = traceback
+            traceback = traceback.tb_next
+        if frame_tb is None or not CODEGEN_AVAILABLE:
+            return None
+        positions = list(code.co_positions())
+        line, _, column, end_column = positions[frame_tb.tb_lasti // 2]
+        return self._spans.get((line, column, end_column))
+
+
+class PythonGenerator:
+    """
+    Generates the source of a Python function from a resolved AST.
+
+    Statements are generated in normal or tail position exactly as the
+    bytecode compiler compiles them: only tail statements set the result.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.spans: Dict[Tuple[int, int, int], Node] = {}
+        self.read: set = set()       # Slots the program reads
+        self.written: set = set()    # Slots the program assigns
+        self.constants: Dict[str, Any] = {}   # Values with no literal form
+        self._parts: List[str] = []
+        self._column = 0
+
+        self._statement_handlers = {
+            AssignNode: self.assign_statement,
+            IncrementNode: self.assign_statement,
+            PrintNode: self.print_statement,
+            IfNode: self.if_statement,
+            WhileNode: self.while_statement,
+            CountedLoopNode: self.while_statement,
+            BlockNode: self.block_statement,
+            BreakNode: self.break_statement,
+            ContinueNode: self.continue_statement,
+        }
+
+    def generate(self, node: Node) -> str:
+        """Generate the function ``_program`` running a resolved program."""
+        body: List[str] = []
+        self.lines = body
+        if type(node) is ProgramNode:
+            self.statements(node.statements, 2, tail=True)
+        else:
+            self.statement(node, 2, tail=True)
+
+        # The body is generated first to learn which slots it uses, so the
+        # span line numbers are shifted past the prologue afterwards
+        prologue = ["def _program(_values, _print):", "    _result = None"]
+        for slot in sorted(self.read | self.written):
+            prologue.append(f"    if _values[{slot}] is not _UNSET: v{slot} = _values[{slot}]")
+        prologue.append("    try:")
+        epilogue = ["    finally:", "        _l = locals()"]
+        for slot in sorted(self.written):
+            epilogue.append(f"        _values[{slot}] = _l.get('v{slot}', _UNSET)")
+        epilogue.append("    return _result")
+
+        shift = len(prologue)
+        self.spans = {(line + shift, start, end): node
+                      for (line, start, end), node in self.spans.items()}
+        return "\n".join(prologue + (body or ["        pass"]) + epilogue) + "\n"
+
+    # ===== Line Writing =====
+
+    def begin_line(self, indent: int):
+        self._parts = [' ' * (4 * indent)]
+        self._column = 4 * indent
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._column += len(text)
+
+    def end_line(self):
+        self.lines.append(''.join(self._parts))
+
+    def line(self, indent: int, text: str):
+        self.begin_line(indent)
+        self.write(text)
+        self.end_line()
+
+    def mark(self, start: int, node: Node):
+        """Record that the text written since column start computes node."""
+        # Body lines are numbered from 1 here and shifted in generate()
+        self.spans[(len(self.lines) + 1, start, self._column)] = node
+
+    # ===== Statements =====
+
+    def statements(self, statements: List[Node], indent: int, tail: bool):
+        """Generate a statement sequence; only the last one can be in tail position."""
+        start = len(self.lines)
+        last = len(statements) - 1
+        for i, stmt in enumerate(statements):
+            self.statement(stmt, indent, tail and i == last)
+        if len(self.lines) == start:
+            self.line(indent, "_result = None" if tail else "pass")
+
+    def statement(self, node: Optional[Node], indent: int, tail: bool):
+        if node is None:
+            return
+        handler = self._statement_handlers.get(type(node))
+        if handler:
+            handler(node, indent, tail)
+        else:
+            # Expression statement
+            self.begin_line(indent)
+            if tail:
+                self.write("_result = ")
+            self.expression(node)
+            self.end_line()
+
+    def body(self, node: Optional[Node], indent: int, tail: bool):
+        """Generate the body of an if or while, which must not be empty."""
+        start = len(self.lines)
+        self.statement(node, indent, tail)
+        if len(self.lines) == start:
+            self.line(indent, "pass")
+
+    def assign_statement(self, node: AssignNode, indent: int, tail: bool):
+        self.written.add(node.slot)
+        self.begin_line(indent)
+        self.write(f"v{node.slot} = ")
+        if tail:
+            self.write("_result = ")
+        self.expression(node.value)
+        self.end_line()
+
+    def print_statement(self, node: PrintNode, indent: int, tail: bool):
+        self.begin_line(indent)
+        self.write("_print(")
+        self.expression(node.value)
+        self.write(")")
+        self.end_line()
+        if tail:
+            self.line(indent, "_result = None")
+
+    def if_statement(self, node: IfNode, indent: int, tail: bool):
+        self.begin_line(indent)
+        self.write("if ")
+        self.expression(node.condition)
+        self.write(":")
+        self.end_line()
+        self.body(node.then, indent + 1, tail)
+        if node.else_ is not None:
+            self.line(indent, "else:")
+            self.body(node.else_, indent + 1, tail)
+        elif tail:
+            # An if whose condition is false evaluates to None
+            self.line(indent, "else:")
+            self.line(indent + 1, "_result = None")
+
+    def while_statement(self, node: WhileNode, indent: int, tail: bool):
+        if tail:
+            # A loop that never runs evaluates to None
+            self.line(indent, "_result = None")
+        self.begin_line(indent)
+        self.write("while ")
+        self.expression(node.condition)
+        self.write(":")
+        self.end_line()
+        self.body(node.body, indent + 1, tail)
+
+    def block_statement(self, node: BlockNode, indent: int, tail: bool):
+        self.statements(node.statements, indent, tail)
+
+    def break_statement(self, node: Node, indent: int, tail: bool):
+        self.line(indent, "break")
+
+    def continue_statement(self, node: Node, indent: int, tail: bool):
+        self.line(indent, "continue")
+
+    # ===== Expressions =====
+
+    def expression(self, node: Node):
+        """Write an expression on the current line."""
+        kind = type(node)
+        if isinstance(node, LiteralNode):
+            self.literal(node.value)
+        elif kind is IdentifierNode:
+            start = self._column
+            self.read.add(node.slot)
+            self.write(f"v{node.slot}")
+            self.mark(start, node)
+        elif kind is BinaryNode:
+            self.binary(node)
+        elif kind is UnaryNode:
+            self.unary(node)
+        else:
+            raise CodegenError(f"Unknown node type: {node.get('tag')}", node)
+
+    def literal(self, value: Any):
+        if value is None or isinstance(value, (bool, str)):
+            # ascii() keeps the source ASCII, so columns equal byte offsets
+            self.write(ascii(value))
+        elif isinstance(value, (int, float)) and math.isfinite(value):
+            text = repr(value)
+            self.write(f"({text})" if text.startswith('-') else text)
+        else:
+            name = f"_k{len(self.constants)}"
+            self.constants[name] = value
+            self.write(name)
+
+    def binary(self, node: BinaryNode):
+        op = node.op
+        function = OPERATOR_FUNCTIONS.get(op)
+        if function is not None:
+            start = self._column
+            self.write(f"{function}(")
+            self.expression(node.left)
+            self.write(", ")
+            self.expression(node.right)
+            self.write(")")
+            self.mark(start, node)
+            return
+
+        python_op = PYTHON_OPERATORS.get(op)
+        if python_op is None:
+            raise CodegenError(f"Unknown operator: {op}", node)
+        self.write("(")
+        start = self._column
+        self.expression(node.left)
+        self.write(f" {python_op} ")
+        self.expression(node.right)
+        self.mark(start, node)
+        self.write(")")
+
+    def unary(self, node: UnaryNode):
+        python_op = UNARY_PYTHON_OPERATORS.get(node.op)
+        if python_op is None:
+            raise CodegenError(f"Unknown unary operator: {node.op}", node)
+        self.write("(")
+        start = self._column
+        self.write(python_op)
+        self.expression(node.operand)
+        self.mark(start, node)
+        self.write(")")
+
+
+def to_python(ast_or_source, names: Iterable[str] = ()) -> str:
+    """
+    Translate source code or an AST into the source of a Python function.
+
+    Args:
+        ast_or_source: Either an AST node or source code string
+        names: Variables already holding slots in the target environment
+
+    Returns:
+        The source of a function ``_program(_values, _print)``
+    """
+    ast = parse(ast_or_source) if isinstance(ast_or_source, str) else ast_or_source
+    return PythonGenerator().generate(Resolver(names).resolve(ast))
+
+
+def compile_program(ast_or_source, names: Iterable[str] = ()) -> Optional[PythonProgram]:
+    """
+    Compile source code or an AST into a PythonProgram.
+
+    Returns None if the program cannot be translated, or Python refuses
+    the translation (e.g. 'break' outside a loop, or more nested blocks
+    than CPython allows); the bytecode compiler then handles it instead.
+    """
+    ast = parse(ast_or_source) if isinstance(ast_or_source, str) else ast_or_source
+    resolver = Resolver(names)
+    generator = PythonGenerator()
+    try:
+        source = generator.generate(resolver.resolve(ast))
+        code = compile(source, '<program>', 'exec')
+    except (CodegenError, SyntaxError, RecursionError, MemoryError):
+        return None
+    namespace = {'add': add, 'divide': divide, '_UNSET': UNSET}
+    namespace.update(generator.constants)
+    exec(code, namespace)
+    return PythonProgram(source, namespace['_program'], tuple(resolver.names),
+                         generator.spans)
+
+
+# Test functions
+def test_to_python():
+    source = to_python("x = 1; while (x < 10) { x = x + 'a' / 2 } x")
+    assert "while (v0 < 10):" in source
+    assert "v0 = add(v0, divide('a', 2))" in source
+    assert "_result = v0" in source
+    print("✓ test_to_python passed")
+
+
+def test_run_program():
+    program = compile_program("i = 0; s = ''; while (i < 3) { i = i + 1; s = s + i; print s }; s")
+    values = [UNSET, UNSET]
+    printed = []
+    assert program.function(values, printed.append) == '123'
+    assert printed == ['1', '12', '123']
+    assert values == [3, '123']
+    print("✓ test_run_program passed")
+
+
+def test_error_node():
+    from operators import OperatorError
+    if not CODEGEN_AVAILABLE:
+        print("- test_error_node skipped (needs Python 3.11)")
+        return
+    program = compile_program("x = 1\ny = (x - 1) / 0")
+    values = [UNSET, UNSET]
+    try:
+        program.function(values, print)
+        assert False, "Expected OperatorError"
+    except OperatorError as e:
+        node = program.node_at(e.__traceback__)
+        assert type(node) is BinaryNode and (node.line, node.column) == (2, 13)
+    # Assignments made before the error are kept
+    assert values == [1, UNSET]
+
+    program = compile_program("z = 1\nz = w")
+    values = [UNSET, UNSET]
+    try:
+        program.function(values, print)
+        assert False, "Expected UnboundLocalError"
+    except UnboundLocalError as e:
+        node = program.node_at(e.__traceback__)
+        assert (node.name, node.line, node.column) == ('w', 2, 5)
+    assert values == [1, UNSET]
+    print("✓ test_error_node passed")
+
+
+def test_untranslatable():
+    assert compile_program("break") is None
+    print("✓ test_untranslatable passed")
+
+
+if __name__ == "__main__":
+    test_to_python()
+    test_run_program()
+    test_error_node()
+    test_untranslatable()
+    print("\nAll codegen tests passed!")
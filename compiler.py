@@ -0,0 +1,472 @@
+"""
+compiler.py - Bytecode Compiler
+
+Lowers the parser's AST into a flat list of instructions plus a constant pool.
+The AST is walked exactly once; the evaluator then runs the instructions in a
+single dispatch loop, so loop bodies are never re-walked.
+
+Instructions are stored structure-of-arrays: opcodes in a compact byte
+array, their arguments in a parallel list, and source lines and columns in
+two more parallel integer arrays that are only consulted when an error is
+raised. Jump arguments are absolute instruction indices. Variables are
+accessed by the slots assigned by resolver.py; instructions carry only the
+slot, and the variable's name is looked up in ``Code.names`` (like its
+location in the line and column arrays) only for errors and watches.
+"""
+
+from array import array
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from parser import (
+    parse, Node, ProgramNode, BlockNode, AssignNode, PrintNode, IfNode, WhileNode,
+    BreakNode, ContinueNode,
+    BinaryNode, UnaryNode, LiteralNode, IdentifierNode,
+)
+from resolver import Resolver
+from loop_opt import CountedLoopNode, IncrementNode, optimize_loops
+from operators import BINARY_OPERATORS, BINARY_OP_IDS, BINOP_DIV
+
+
+# Opcodes
+OP_LOAD_CONST = 0          # arg: index into consts
+OP_LOAD_NAME = 1           # arg: slot
+OP_STORE_NAME = 2          # arg: slot - pops the value
+OP_BINARY = 3              # arg: operator id from operators.BINARY_OP_IDS
+OP_NEG = 4
+OP_NOT = 5
+OP_JUMP = 6                # arg: target
+OP_JUMP_IF_FALSE = 7       # arg: target - pops the condition
+OP_JUMP_IF_FALSE_OR_POP = 8    # arg: target - keeps the value if jumping
+OP_JUMP_IF_TRUE_OR_POP = 9     # arg: target - keeps the value if jumping
+OP_PRINT = 10
+OP_POP = 11
+OP_DUP = 12
+OP_STORE_RESULT = 13       # pops into the program's result register
+OP_LOOP_TEST = 14          # arg: (slot, op id, const index, target) - counted loop test
+OP_INCREMENT = 15          # arg: (slot, op id, const index) - counted loop step
+
+NUM_OPCODES = 16
+
+OPCODE_NAMES = {
+    value: name for name, value in globals().items()
+    if name.startswith('OP_')
+}
+
+UNARY_OPCODES = {
+    '-': OP_NEG,
+    '!': OP_NOT,
+}
+
+
+class CompileError(Exception):
+    """Exception raised for AST nodes the compiler cannot lower."""
+    def __init__(self, message: str, node: Node):
+        self.node = node
+        line = node.get('line', '?')
+        column = node.get('column', '?')
+        super().__init__(f"Compile error at line {line}, column {column}: {message}")
+
+
+class Code:
+    """
+    A compiled program: instructions, constant pool and location table.
+
+    ``names`` lists the program's variables in slot order; the environment it
+    runs in must hold them in the same slots.
+    """
+
+    def __init__(self, ops: array, args: List[Any], consts: List[Any],
+                 lines: array, columns: array, names: Tuple[str, ...] = ()):
+        self.ops = ops
+        self.args = args
+        self.consts = consts
+        self.lines = lines
+        self.columns = columns
+        self.names = names
+
+    @property
+    def instructions(self) -> List[Tuple[int, Any]]:
+        """The instructions as ``(opcode, arg)`` pairs."""
+        return list(zip(self.ops, self.args))
+
+    def location(self, pc: int) -> Dict[str, int]:
+        """Get the source location of the instruction at pc."""
+        return {'line': self.lines[pc], 'column': self.columns[pc]}
+
+    def disassemble(self) -> str:
+        """Render the instructions in a human-readable form."""
+        lines = []
+        for pc, (op, arg) in enumerate(zip(self.ops, self.args)):
+            text = f"{pc:4d} {OPCODE_NAMES[op]}"
+            if op == OP_LOAD_CONST:
+                text += f" {self.consts[arg]!r}"
+            elif op == OP_BINARY:
+                text += f" {BINARY_OPERATORS[arg]}"
+            elif op in (OP_LOAD_NAME, OP_STORE_NAME):
+                text += f" {self.names[arg]}"
+            elif arg is not None:
+                text += f" {arg!r}"
+            lines.append(text)
+        return "\n".join(lines)
+
+
+class Compiler:
+    """
+    Compiles an AST into a Code object.
+
+    Statements are compiled in either normal or "tail" position. A statement
+    is in tail position when its value can become the value of the whole
+    program (the last statement of the program, and recursively the last
+    statement of a block, the branches of an if, or the body of a while in
+    tail position). Only tail statements write the result register, so every
+    other statement simply discards its value.
+    """
+
+    def __init__(self):
+        self.ops = array('B')
+        self.args: List[Any] = []
+        self.consts: List[Any] = []
+        self.lines = array('I')
+        self.columns = array('I')
+        self._const_index: Dict[Tuple[type, Any], int] = {}
+
+        # Enclosing loops, innermost last: (continue target, break jumps to patch)
+        self._loops: List[Tuple[int, List[int]]] = []
+
+        # Statement handlers by node class; anything else is an expression
+        self._statement_handlers = {
+            AssignNode: self.compile_assign_statement,
+            PrintNode: self.compile_print_statement,
+            IfNode: self.compile_if_statement,
+            WhileNode: self.compile_while_statement,
+            BlockNode: self.compile_block_statement,
+            CountedLoopNode: self.compile_counted_loop_statement,
+            IncrementNode: self.compile_increment_statement,
+            BreakNode: self.compile_break_statement,
+            ContinueNode: self.compile_continue_statement,
+        }
+
+    def compile(self, node: Node, names: Tuple[str, ...] = ()) -> Code:
+        """Compile a resolved program (or a single statement) into a Code object."""
+        if type(node) is ProgramNode:
+            self.compile_statements(node.statements, node, tail=True)
+        else:
+            self.compile_statement(node, tail=True)
+        return Code(self.ops, self.args, self.consts, self.lines, self.columns, names)
+
+    # ===== Emission Helpers =====
+
+    def emit(self, op: int, arg: Any, node: Node) -> int:
+        """Append an instruction and return its index."""
+        self.ops.append(op)
+        self.args.append(arg)
+        self.lines.append(node.line)
+        self.columns.append(node.column)
+        return len(self.ops) - 1
+
+    def patch(self, index: int, target: int):
+        """Point the jump instruction at index to target."""
+        self.args[index] = target
+
+    def add_const(self, value: Any) -> int:
+        """Add a value to the constant pool, reusing identical entries."""
+        # Key on the type too, since 1, 1.0 and TRUE are equal as dict keys
+        key = (type(value), value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = len(self.consts)
+            self.consts.append(value)
+            self._const_index[key] = index
+        return index
+
+    def emit_const(self, value: Any, node: Node) -> int:
+        return self.emit(OP_LOAD_CONST, self.add_const(value), node)
+
+    def emit_result(self, node: Node, tail: bool):
+        """Store the value on top of the stack as the result, or discard it."""
+        self.emit(OP_STORE_RESULT if tail else OP_POP, None, node)
+
+    # ===== Statements =====
+
+    def compile_statements(self, statements: List[Node],
+                           node: Node, tail: bool):
+        """Compile a statement sequence; only the last one can be in tail position."""
+        if not statements:
+            if tail:
+                self.emit_const(None, node)
+                self.emit(OP_STORE_RESULT, None, node)
+            return
+        last = len(statements) - 1
+        for i, stmt in enumerate(statements):
+            self.compile_statement(stmt, tail and i == last)
+
+    def compile_statement(self, node: Optional[Node], tail: bool):
+        """Compile a single statement."""
+        if node is None:
+            # A missing branch/body (e.g. 'if (x)' at end of file) does nothing
+            return
+
+        handler = self._statement_handlers.get(type(node))
+        if handler:
+            handler(node, tail)
+        else:
+            # Expression statement
+            self.compile_expression(node)
+            self.emit_result(node, tail)
+
+    def compile_assign_statement(self, node: Node, tail: bool):
+        self.compile_expression(node.value)
+        if tail:
+            self.emit(OP_DUP, None, node)
+        self.emit(OP_STORE_NAME, node.slot, node)
+        if tail:
+            self.emit(OP_STORE_RESULT, None, node)
+
+    def compile_print_statement(self, node: Node, tail: bool):
+        self.compile_expression(node.value)
+        self.emit(OP_PRINT, None, node)
+        if tail:
+            self.emit_const(None, node)
+            self.emit(OP_STORE_RESULT, None, node)
+
+    def compile_if_statement(self, node: Node, tail: bool):
+        self.compile_expression(node.condition)
+        jump_to_else = self.emit(OP_JUMP_IF_FALSE, None, node)
+        self.compile_statement(node.then, tail)
+
+        else_branch = node.else_
+        if else_branch or tail:
+            jump_to_end = self.emit(OP_JUMP, None, node)
+            self.patch(jump_to_else, len(self.ops))
+            if else_branch:
+                self.compile_statement(else_branch, tail)
+            else:
+                # An if whose condition is false evaluates to None
+                self.emit_const(None, node)
+                self.emit(OP_STORE_RESULT, None, node)
+            self.patch(jump_to_end, len(self.ops))
+        else:
+            self.patch(jump_to_else, len(self.ops))
+
+    def compile_while_statement(self, node: Node, tail: bool):
+        if tail:
+            # A loop that never runs evaluates to None
+            self.emit_const(None, node)
+            self.emit(OP_STORE_RESULT, None, node)
+
+        loop_start = len(self.ops)
+        self.compile_expression(node.condition)
+        jump_to_end = self.emit(OP_JUMP_IF_FALSE, None, node)
+        self.compile_loop_body(node, loop_start, tail)
+        self.patch(jump_to_end, len(self.ops))
+
+    def compile_counted_loop_statement(self, node: CountedLoopNode, tail: bool):
+        if tail:
+            self.emit_const(None, node)
+            self.emit(OP_STORE_RESULT, None, node)
+
+        # The test reads the variable, so it reports errors where the
+        # condition's variable reference is
+        loop_start = len(self.ops)
+        loop_test = self.emit(OP_LOOP_TEST, None, node.condition.left)
+        self.compile_loop_body(node, loop_start, tail)
+        self.args[loop_test] = (node.slot, BINARY_OP_IDS[node.op],
+                                self.add_const(node.limit), len(self.ops))
+
+    def compile_loop_body(self, node: WhileNode, loop_start: int, tail: bool):
+        """Compile a loop body and the jump back to loop_start; breaks exit after it."""
+        breaks: List[int] = []
+        self._loops.append((loop_start, breaks))
+        self.compile_statement(node.body, tail)
+        self._loops.pop()
+        self.emit(OP_JUMP, loop_start, node)
+        for jump in breaks:
+            self.patch(jump, len(self.ops))
+
+    def compile_break_statement(self, node: Node, tail: bool):
+        if not self._loops:
+            raise CompileError("'break' outside loop", node)
+        self._loops[-1][1].append(self.emit(OP_JUMP, None, node))
+
+    def compile_continue_statement(self, node: Node, tail: bool):
+        if not self._loops:
+            raise CompileError("'continue' outside loop", node)
+        self.emit(OP_JUMP, self._loops[-1][0], node)
+
+    def compile_increment_statement(self, node: IncrementNode, tail: bool):
+        # Located at the assignment, which is where watches report the step
+        self.emit(OP_INCREMENT,
+                  (node.slot, BINARY_OP_IDS[node.op], self.add_const(node.step)),
+                  node)
+        if tail:
+            # The stepped value becomes the result
+            self.emit(OP_LOAD_NAME, node.slot, node)
+            self.emit(OP_STORE_RESULT, None, node)
+
+    def compile_block_statement(self, node: Node, tail: bool):
+        # Blocks never own variables (see resolver.py), so entering one
+        # needs no instruction and no environment of its own
+        self.compile_statements(node.statements, node, tail)
+
+    # ===== Expressions =====
+
+    def compile_expression(self, node: Node):
+        """Compile an expression that leaves its value on the stack."""
+        kind = type(node)
+
+        if isinstance(node, LiteralNode):
+            self.emit_const(node.value, node)
+        elif kind is IdentifierNode:
+            self.emit(OP_LOAD_NAME, node.slot, node)
+        elif kind is BinaryNode:
+            self.compile_binary(node)
+        elif kind is UnaryNode:
+            self.compile_unary(node)
+        else:
+            raise CompileError(f"Unknown node type: {node.get('tag')}", node)
+
+    def compile_unary(self, node: Node):
+        op = UNARY_OPCODES.get(node.op)
+        if op is None:
+            raise CompileError(f"Unknown unary operator: {node.op}", node)
+
+        # Collapse a run of the same operator: '!!!x' is '!x' and '----x' is
+        # '--x', so at most two are kept (two, not zero, because '!!x' makes
+        # a boolean and '--TRUE' makes an integer)
+        chain = [node]
+        operand = node.operand
+        while type(operand) is UnaryNode and operand.op == node.op:
+            chain.append(operand)
+            operand = operand.operand
+        kept = chain[len(chain) % 2 - 2:]
+
+        self.compile_expression(operand)
+        for unary in reversed(kept):
+            self.emit(op, None, unary)
+
+    def compile_binary(self, node: Node):
+        op = node.op
+        op_id = BINARY_OP_IDS.get(op)
+        if op_id is not None:
+            self.compile_expression(node.left)
+            self.compile_expression(node.right)
+            self.emit(OP_BINARY, op_id, node)
+            return
+
+        # Short-circuit operators leave the deciding operand on the stack
+        if op == '&&' or op == '||':
+            self.compile_expression(node.left)
+            jump_op = OP_JUMP_IF_FALSE_OR_POP if op == '&&' else OP_JUMP_IF_TRUE_OR_POP
+            jump_to_end = self.emit(jump_op, None, node)
+            self.compile_expression(node.right)
+            self.patch(jump_to_end, len(self.ops))
+            return
+
+        raise CompileError(f"Unknown operator: {op}", node)
+
+
+def compile_ast(ast_or_source, names: Iterable[str] = ()) -> Code:
+    """
+    Compile source code or an AST into a Code object.
+
+    Args:
+        ast_or_source: Either an AST node or source code string
+        names: Variables already holding slots in the target environment
+
+    Returns:
+        Code object ready for Evaluator.run()
+    """
+    if isinstance(ast_or_source, str):
+        ast = parse(ast_or_source)
+    else:
+        ast = ast_or_source
+
+    resolver = Resolver(names)
+    ast = optimize_loops(resolver.resolve(ast))
+    return Compiler().compile(ast, tuple(resolver.names))
+
+
+# Test functions
+def test_compile_constants():
+    code = compile_ast("1; 1.0; TRUE; 1")
+    # 1, 1.0 and TRUE compare equal but must stay distinct constants
+    assert code.consts == [1, 1.0, True]
+    assert [type(c) for c in code.consts] == [int, float, bool]
+    print("✓ test_compile_constants passed")
+
+
+def test_compile_binary():
+    code = compile_ast("x = y + 3")
+    ops = list(code.ops)
+    assert ops == [OP_LOAD_NAME, OP_LOAD_CONST, OP_BINARY, OP_DUP,
+                   OP_STORE_NAME, OP_STORE_RESULT]
+    assert BINARY_OPERATORS[code.args[2]] == '+'
+    assert code.args[4] == 0 and code.location(4) == {'line': 1, 'column': 1}
+    assert code.names == ('x', 'y')
+    assert code.disassemble().splitlines()[4].endswith("STORE_NAME x")
+    print("✓ test_compile_binary passed")
+
+
+def test_compile_while_jumps():
+    code = compile_ast("while (x < 5) { x = x * 2 }; y = 0")
+    jumps = [(pc, arg) for pc, (op, arg) in enumerate(code.instructions)
+             if op in (OP_JUMP, OP_JUMP_IF_FALSE)]
+    (exit_pc, exit_target), (back_pc, back_target) = jumps
+    # The backward jump returns to the condition at the top of the loop
+    assert back_target == 0
+    # The exit jump lands just past the backward jump
+    assert exit_target == back_pc + 1
+    print("✓ test_compile_while_jumps passed")
+
+
+def test_compile_counted_loop():
+    code = compile_ast("i = 0; while (i < 5) { s = i; i = i + 1 }")
+    ops = list(code.ops)
+    test_pc = ops.index(OP_LOOP_TEST)
+    slot, op_id, limit, target = code.args[test_pc]
+    assert (code.names[slot], BINARY_OPERATORS[op_id], code.consts[limit]) == ('i', '<', 5)
+    # The exit target lands just past the backward jump to the test
+    assert code.instructions[target - 1] == (OP_JUMP, test_pc)
+    assert OP_INCREMENT in ops
+    print("✓ test_compile_counted_loop passed")
+
+
+def test_compile_unary_chain():
+    code = compile_ast("a = !!!!!x; b = ----y; c = -!-x")
+    ops = list(code.ops)
+    assert ops.count(OP_NOT) == 2      # '!!!!!' keeps one, '!' in '-!-' one
+    assert ops.count(OP_NEG) == 4      # '----' keeps two, '-!-' keeps both
+    print("✓ test_compile_unary_chain passed")
+
+
+def test_compile_break_continue():
+    code = compile_ast("while (x < 5) { if (x == 2) { break } continue }; y = 0")
+    jumps = [(pc, arg) for pc, (op, arg) in enumerate(code.instructions) if op == OP_JUMP]
+    (break_pc, break_target), (continue_pc, continue_target), (back_pc, back_target) = jumps
+    assert continue_target == back_target == 0
+    assert break_target == back_pc + 1
+    try:
+        compile_ast("break")
+        assert False, "Expected CompileError"
+    except CompileError as e:
+        assert "'break' outside loop" in str(e)
+    print("✓ test_compile_break_continue passed")
+
+
+def test_compile_locations():
+    code = compile_ast("x = 1\ny = x / 0")
+    assert len(code.lines) == len(code.columns) == len(code.ops) == len(code.args)
+    div_pc = code.instructions.index((OP_BINARY, BINOP_DIV))
+    assert code.location(div_pc) == {'line': 2, 'column': 7}
+    print("✓ test_compile_locations passed")
+
+
+if __name__ == "__main__":
+    test_compile_constants()
+    test_compile_binary()
+    test_compile_while_jumps()
+    test_compile_counted_loop()
+    test_compile_unary_chain()
+    test_compile_break_continue()
+    test_compile_locations()
+    print("\nAll compiler tests passed!")
@@ -1,42 +1,147 @@
 """
-evaluator.py - AST Evaluator with Variable Watch Support
+evaluator.py - Bytecode Evaluator with Variable Watch Support
 
-Evaluates the AST and executes the program. Supports watching variables
-for changes and reporting when they are created or modified.
+Compiles the AST to bytecode (see compiler.py) and executes it in a single
+dispatch loop. Supports watching variables for changes and reporting when
+they are created or modified. Programs run without a watch go to a faster
+tier where one applies: the Numba kernel for purely numeric programs (see
+numeric.py), and otherwise generated Python (see codegen.py).
 """
 
-from typing import Dict, Any, Optional, Callable, List
+from collections.abc import MutableMapping
+from typing import Dict, Any, Optional, Callable, List, Tuple, Iterator
 
+from compiler import (
+    Code, compile_ast, NUM_OPCODES,
+    OP_LOAD_CONST, OP_LOAD_NAME, OP_STORE_NAME, OP_BINARY, OP_NEG, OP_NOT,
+    OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_FALSE_OR_POP, OP_JUMP_IF_TRUE_OR_POP,
+    OP_PRINT, OP_POP, OP_DUP, OP_STORE_RESULT, OP_LOOP_TEST, OP_INCREMENT,
+)
+from parser import Node
+from resolver import UNSET
+from operators import BINOP_TABLE, OperatorError, is_truthy
+import numeric
+import codegen
 
-class RuntimeError(Exception):
+
+class EvalError(Exception):
     """Exception raised for runtime errors."""
     def __init__(self, message: str, node: Dict[str, Any]):
+        super().__init__(message)
+        self.message = message
         self.node = node
-        line = node.get('line', '?')
-        column = node.get('column', '?')
-        super().__init__(f"Runtime error at line {line}, column {column}: {message}")
+    
+    def __str__(self) -> str:
+        # Formatted on demand, so errors that are caught cost no formatting
+        line = self.node.get('line', '?')
+        column = self.node.get('column', '?')
+        return f"Runtime error at line {line}, column {column}: {self.message}"
 
 
-class BreakException(Exception):
-    """Exception used to implement break statement."""
-    pass
+class _Trap(Exception):
+    """Raised by opcode handlers; converted to a located EvalError by run()."""
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
 
 
-class ContinueException(Exception):
-    """Exception used to implement continue statement."""
-    pass
+class WatchState:
+    """The watched variable and its callback, shared by an environment tree."""
+    __slots__ = ('name', 'callback')
+    
+    def __init__(self):
+        self.name: Optional[str] = None
+        self.callback: Optional[Callable[[str, Any, int, int], None]] = None
+    
+    @property
+    def active(self) -> bool:
+        return self.name is not None and bool(self.callback)
+
+
+class ScopeVariables(MutableMapping):
+    """
+    Live dict view of the variables that hold a value in one scope.
+    
+    Reads and writes go straight to the scope's slots, like the plain dict
+    environments used to keep; writes through the view do not notify the
+    watch (use Environment.define for that).
+    """
+    __slots__ = ('_env',)
+    
+    def __init__(self, env: 'Environment'):
+        self._env = env
+    
+    def __getitem__(self, name: str) -> Any:
+        slot = self._env._holds(name)
+        if slot is None:
+            raise KeyError(name)
+        return self._env.values[slot]
+    
+    def __setitem__(self, name: str, value: Any):
+        env = self._env
+        env.values[env.declare(name)] = value
+    
+    def __delitem__(self, name: str):
+        slot = self._env._holds(name)
+        if slot is None:
+            raise KeyError(name)
+        self._env.values[slot] = UNSET
+    
+    def __iter__(self) -> Iterator[str]:
+        env = self._env
+        return (name for name, value in zip(env.names, env.values)
+                if value is not UNSET)
+    
+    def __len__(self) -> int:
+        return sum(value is not UNSET for value in self._env.values)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
 
 
 class Environment:
     """
     Environment for storing variables with watch support.
+    
+    Variables live in the ``values`` list at the slot numbers handed out by
+    the resolver; ``names[i]`` is the name of slot i. A slot holds UNSET
+    until its variable is first assigned.
     """
     
     def __init__(self, parent: Optional['Environment'] = None):
-        self.variables: Dict[str, Any] = {}
+        self.names: List[str] = []
+        self.values: List[Any] = []
         self.parent = parent
-        self.watch_callback: Optional[Callable[[str, Any, int, int], None]] = None
-        self.watched_variable: Optional[str] = None
+        self._watch: WatchState = parent._watch if parent else WatchState()
+        self._slots: Dict[str, int] = {}
+    
+    @property
+    def watched_variable(self) -> Optional[str]:
+        return self._watch.name
+    
+    @watched_variable.setter
+    def watched_variable(self, name: Optional[str]):
+        self._watch.name = name
+    
+    @property
+    def watch_callback(self) -> Optional[Callable[[str, Any, int, int], None]]:
+        return self._watch.callback
+    
+    @watch_callback.setter
+    def watch_callback(self, callback: Optional[Callable[[str, Any, int, int], None]]):
+        self._watch.callback = callback
+    
+    @property
+    def variables(self) -> ScopeVariables:
+        """The variables that hold a value in this scope, as a live dict view."""
+        return ScopeVariables(self)
+    
+    def root(self) -> 'Environment':
+        """Get the top-level environment, where assignments create variables."""
+        env = self
+        while env.parent:
+            env = env.parent
+        return env
     
     def set_watch(self, variable_name: str, callback: Callable[[str, Any, int, int], None]):
         """
@@ -46,26 +151,38 @@ class Environment:
             variable_name: The name of the variable to watch
             callback: Function called when variable changes: callback(name, value, line, col)
         """
-        self.watched_variable = variable_name
-        self.watch_callback = callback
-        
-        # Propagate to parent environments
-        if self.parent:
-            self.parent.set_watch(variable_name, callback)
+        # Every scope shares its root's WatchState, so this applies to all
+        self._watch.name = variable_name
+        self._watch.callback = callback
     
     def _notify_watch(self, name: str, value: Any, line: int, column: int):
         """Notify the watch callback if this variable is being watched."""
-        if self.watched_variable == name and self.watch_callback:
-            self.watch_callback(name, value, line, column)
-        if self.parent:
-            self.parent._notify_watch(name, value, line, column)
+        watch = self._watch
+        if watch.name == name and watch.callback:
+            watch.callback(name, value, line, column)
+    
+    def declare(self, name: str) -> int:
+        """Give a name a slot in this scope (if it has none) and return it."""
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.names.append(name)
+            self.values.append(UNSET)
+            self._slots[name] = slot
+        return slot
+    
+    def _holds(self, name: str) -> Optional[int]:
+        """Get the slot of name if it holds a value in this scope, else None."""
+        slot = self._slots.get(name)
+        if slot is not None and self.values[slot] is not UNSET:
+            return slot
+        return None
     
     def define(self, name: str, value: Any, line: int = 0, column: int = 0):
         """
         Define a new variable in the current scope.
         """
-        is_new = name not in self.variables
-        self.variables[name] = value
+        self.values[self.declare(name)] = value
         self._notify_watch(name, value, line, column)
     
     def assign(self, name: str, value: Any, line: int = 0, column: int = 0) -> bool:
@@ -73,22 +190,24 @@ class Environment:
         Assign a value to an existing variable (searches parent scopes).
         Returns True if found and assigned, False otherwise.
         """
-        if name in self.variables:
-            self.variables[name] = value
+        slot = self._holds(name)
+        if slot is not None:
+            self.values[slot] = value
             self._notify_watch(name, value, line, column)
             return True
         elif self.parent:
             return self.parent.assign(name, value, line, column)
         else:
-            # Variable doesn't exist, create it in current scope
-            self.variables[name] = value
+            # Variable doesn't exist, create it in the top-level scope
+            self.values[self.declare(name)] = value
             self._notify_watch(name, value, line, column)
             return True
     
     def get(self, name: str) -> Any:
         """Get a variable's value (searches parent scopes)."""
-        if name in self.variables:
-            return self.variables[name]
+        slot = self._holds(name)
+        if slot is not None:
+            return self.values[slot]
         elif self.parent:
             return self.parent.get(name)
         else:
@@ -96,7 +215,7 @@ class Environment:
     
     def exists(self, name: str) -> bool:
         """Check if a variable exists."""
-        if name in self.variables:
+        if self._holds(name) is not None:
             return True
         elif self.parent:
             return self.parent.exists(name)
@@ -105,203 +224,325 @@ class Environment:
 
 class Evaluator:
     """
-    Evaluates AST nodes and executes the program.
+    Executes programs by compiling the AST to bytecode and running it.
     """
     
-    def __init__(self, env: Optional[Environment] = None):
+    def __init__(self, env: Optional[Environment] = None, echo: bool = True):
         self.env = env or Environment()
-        self.output: List[str] = []  # Captured print output
-    
-    def evaluate(self, node: Dict[str, Any]) -> Any:
+        self._output: List[Any] = []  # Printed values, stringified on demand
+        self._echo = echo  # Also write printed values to stdout
+        self.use_jit = numeric.NUMBA_AVAILABLE  # Numeric programs run in the Numba tier
+        self.use_codegen = codegen.CODEGEN_AVAILABLE  # Others run as generated Python
+        self._stack: List[Any] = []
+        self._consts: List[Any] = []
+        self._globals: List[Any] = []  # The root environment's slot values
+        self._code: Optional[Code] = None
+        self._result: Any = None
+        self._watch_active = False
+        self._watch_name: Optional[str] = None
+        self._watch_slot = -1
+        self._watch_callback: Optional[Callable[[str, Any, int, int], None]] = None
+        
+        # Opcode-indexed dispatch table
+        self._handlers: List[Callable[[Any], Optional[int]]] = [None] * NUM_OPCODES
+        self._handlers[OP_LOAD_CONST] = self.op_load_const
+        self._handlers[OP_LOAD_NAME] = self.op_load_name
+        self._handlers[OP_STORE_NAME] = self.op_store_name
+        self._handlers[OP_BINARY] = self.op_binary
+        self._handlers[OP_NEG] = self.op_neg
+        self._handlers[OP_NOT] = self.op_not
+        self._handlers[OP_JUMP] = self.op_jump
+        self._handlers[OP_JUMP_IF_FALSE] = self.op_jump_if_false
+        self._handlers[OP_JUMP_IF_FALSE_OR_POP] = self.op_jump_if_false_or_pop
+        self._handlers[OP_JUMP_IF_TRUE_OR_POP] = self.op_jump_if_true_or_pop
+        self._handlers[OP_PRINT] = self.op_print
+        self._handlers[OP_POP] = self.op_pop
+        self._handlers[OP_DUP] = self.op_dup
+        self._handlers[OP_STORE_RESULT] = self.op_store_result
+        self._handlers[OP_LOOP_TEST] = self.op_loop_test
+        self._handlers[OP_INCREMENT] = self.op_increment
+    
+    @property
+    def output(self) -> List[str]:
+        """The captured print output, one string per print."""
+        return self.get_output()
+    
+    def get_output(self) -> List[str]:
+        """Get the captured print output, one string per print."""
+        output = self._output
+        # Values are immutable, so converting late gives the same text
+        output[:] = [str(value) for value in output]
+        return output
+    
+    def evaluate(self, node: Node) -> Any:
         """
-        Evaluate an AST node.
+        Compile and run an AST node.
         
         Args:
-            node: The AST node to evaluate
+            node: The AST node to evaluate (normally a program)
             
         Returns:
             The result of evaluating the node
         """
-        tag = node.get('tag')
-        
-        # Dispatch to appropriate handler
-        handler = getattr(self, f'eval_{tag}', None)
-        if handler:
-            return handler(node)
-        else:
-            raise RuntimeError(f"Unknown node type: {tag}", node)
-    
-    def eval_program(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a program (sequence of statements)."""
-        result = None
-        for stmt in node.get('statements', []):
-            result = self.evaluate(stmt)
-        return result
-    
-    def eval_block(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a block of statements in a new scope."""
-        # Create a new environment for the block
-        old_env = self.env
-        self.env = Environment(parent=old_env)
+        env = self.env
+        if env.parent is None:
+            return self._evaluate(node)
+        # Slots are flat, so a nested scope runs against one frame holding the
+        # innermost binding of each name; afterwards each value goes back to
+        # the scope it came from, and new variables to the top-level scope
+        chain = []
+        while env:
+            chain.append(env)
+            env = env.parent
+        frame = Environment()
+        frame._watch = self.env._watch
+        owners: Dict[str, Environment] = {}
+        for scope in reversed(chain):
+            for name, value in zip(scope.names, scope.values):
+                if value is not UNSET:
+                    frame.values[frame.declare(name)] = value
+                    owners[name] = scope
+        env, self.env = self.env, frame
+        try:
+            return self._evaluate(node)
+        finally:
+            self.env = env
+            root = chain[-1]
+            for name, value in zip(frame.names, frame.values):
+                if value is not UNSET:
+                    scope = owners.get(name, root)
+                    scope.values[scope.declare(name)] = value
+    
+    def _evaluate(self, node: Node) -> Any:
+        root = self.env.root()
+        code = None
+        # Generated code has no watch hooks, so watched programs use bytecode
+        if self.use_codegen and not root._watch.active:
+            if self.use_jit:
+                # Programs the numeric tier accepts run in its kernel (see run())
+                code = compile_ast(node, root.names)
+                if numeric.accepts(code):
+                    return self.run(code)
+            program = codegen.compile_program(node, root.names)
+            if program is not None:
+                return self.run_python(program)
+        if code is None:
+            code = compile_ast(node, root.names)
+        return self.run(code)
+    
+    def run_python(self, program: codegen.PythonProgram) -> Any:
+        """
+        Run a program compiled to Python.
         
-        # Copy watch settings to new environment
-        if old_env.watched_variable:
-            self.env.set_watch(old_env.watched_variable, old_env.watch_callback)
+        Args:
+            program: The PythonProgram produced by codegen.compile_program()
+            
+        Returns:
+            The value of the last statement executed in tail position
+        """
+        root = self.env.root()
+        for name in program.names[len(root.names):]:
+            root.declare(name)
         
+        self._result = None
         try:
-            result = None
-            for stmt in node.get('statements', []):
-                result = self.evaluate(stmt)
-            return result
-        finally:
-            self.env = old_env
-    
-    def eval_assign(self, node: Dict[str, Any]) -> Any:
-        """Evaluate an assignment statement."""
-        name = node['name']
-        value = self.evaluate(node['value'])
-        line = node.get('line', 0)
-        column = node.get('column', 0)
+            self._result = program.function(root.values, self._print_value)
+        except OperatorError as e:
+            node = program.node_at(e.__traceback__)
+            raise EvalError(e.message, node or {})
+        except UnboundLocalError as e:
+            # Only the program's variables are locals that can be unbound
+            node = program.node_at(e.__traceback__)
+            if node is None:
+                raise
+            raise EvalError(f"Undefined variable: {node.name}", node)
+        return self._result
+    
+    def run(self, code: Code) -> Any:
+        """
+        Run compiled bytecode.
         
-        self.env.assign(name, value, line, column)
-        return value
-    
-    def eval_print(self, node: Dict[str, Any]) -> None:
-        """Evaluate a print statement."""
-        value = self.evaluate(node['value'])
-        output = str(value)
-        self.output.append(output)
-        print(output)
-        return None
-    
-    def eval_if(self, node: Dict[str, Any]) -> Any:
-        """Evaluate an if statement."""
-        condition = self.evaluate(node['condition'])
+        Args:
+            code: The Code object produced by the compiler
+            
+        Returns:
+            The value of the last statement executed in tail position
+        """
+        # Variables always live in the root environment, in the slots the
+        # resolver assigned
+        root = self.env.root()
+        for name in code.names[len(root.names):]:
+            root.declare(name)
         
-        if self._is_truthy(condition):
-            return self.evaluate(node['then'])
-        elif node.get('else_'):
-            return self.evaluate(node['else_'])
-        return None
-    
-    def eval_while(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a while loop."""
-        result = None
-        while self._is_truthy(self.evaluate(node['condition'])):
-            try:
-                result = self.evaluate(node['body'])
-            except BreakException:
-                break
-            except ContinueException:
-                continue
-        return result
-    
-    def eval_binary(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a binary operation."""
-        op = node['op']
-        left = self.evaluate(node['left'])
+        watch = root._watch
+        self._watch_active = watch.active
+        self._watch_name = watch.name
+        self._watch_callback = watch.callback
+        names = code.names
+        self._watch_slot = names.index(watch.name) if watch.name in names else -1
         
-        # Short-circuit evaluation for logical operators
-        if op == '&&':
-            if not self._is_truthy(left):
-                return left
-            return self.evaluate(node['right'])
-        elif op == '||':
-            if self._is_truthy(left):
-                return left
-            return self.evaluate(node['right'])
+        # Numeric programs without a watch can run in the compiled kernel
+        if self.use_jit and not self._watch_active:
+            ok, result = numeric.run_program(code, root)
+            if ok:
+                self._result = result
+                return result
         
-        right = self.evaluate(node['right'])
+        # Bind every opcode to its handler once, so the loop below does a
+        # single list index per instruction instead of re-indexing the
+        # dispatch table each time an instruction runs
+        handlers = self._handlers
+        args = code.args
+        if self._watch_active:
+            handlers = list(handlers)
+            handlers[OP_STORE_NAME] = self.op_store_name_watched
+            handlers[OP_INCREMENT] = self.op_increment_watched
+            # The watched stores also get their pc, to look up the location
+            # of a change they report
+            args = [(arg, pc) if op == OP_STORE_NAME or op == OP_INCREMENT else arg
+                    for pc, (op, arg) in enumerate(zip(code.ops, args))]
+        bound = [handlers[op] for op in code.ops]
+        n = len(bound)
+        pc = 0
         
-        # Arithmetic operators
-        if op == '+':
-            if isinstance(left, str) or isinstance(right, str):
-                return str(left) + str(right)
-            return left + right
-        elif op == '-':
-            return left - right
-        elif op == '*':
-            return left * right
-        elif op == '/':
-            if right == 0:
-                raise RuntimeError("Division by zero", node)
-            return left / right
-        elif op == '%':
-            return left % right
+        self._code = code
+        self._stack = []
+        self._consts = code.consts
+        self._globals = root.values
+        self._result = None
         
-        # Comparison operators
-        elif op == '==':
-            return left == right
-        elif op == '!=':
-            return left != right
-        elif op == '<':
-            return left < right
-        elif op == '>':
-            return left > right
-        elif op == '<=':
-            return left <= right
-        elif op == '>=':
-            return left >= right
+        try:
+            while pc < n:
+                target = bound[pc](args[pc])
+                pc += 1
+                if target is not None:
+                    pc = target
+        except (_Trap, OperatorError) as trap:
+            raise EvalError(trap.message, code.location(pc))
         
-        else:
-            raise RuntimeError(f"Unknown operator: {op}", node)
+        return self._result
+    
+    # ===== Opcode Handlers =====
+    # Each handler receives the instruction argument. Jumps return the
+    # target pc; every other handler returns None.
+    
+    def op_load_const(self, index: int):
+        self._stack.append(self._consts[index])
+    
+    def _undefined(self, slot: int) -> _Trap:
+        return _Trap(f"Undefined variable: {self._code.names[slot]}")
+    
+    def _notify_watch(self, value: Any, pc: int):
+        """Report a change of the watched variable made by the instruction at pc."""
+        code = self._code
+        self._watch_callback(self._watch_name, value, code.lines[pc], code.columns[pc])
+    
+    def op_load_name(self, slot: int):
+        value = self._globals[slot]
+        if value is UNSET:
+            raise self._undefined(slot)
+        self._stack.append(value)
+    
+    def op_store_name(self, slot: int):
+        self._globals[slot] = self._stack.pop()
+    
+    def op_store_name_watched(self, arg: Tuple[int, int]):
+        """STORE_NAME when a watch is set: store, then notify if watched."""
+        slot, pc = arg
+        value = self._stack.pop()
+        self._globals[slot] = value
+        if slot == self._watch_slot:
+            self._notify_watch(value, pc)
+    
+    def op_binary(self, op_id: int):
+        stack = self._stack
+        right = stack.pop()
+        stack[-1] = BINOP_TABLE[op_id](stack[-1], right)
+    
+    def op_neg(self, arg):
+        stack = self._stack
+        stack[-1] = -stack[-1]
+    
+    def op_not(self, arg):
+        stack = self._stack
+        stack[-1] = not is_truthy(stack[-1])
+    
+    def op_jump(self, target: int) -> int:
+        return target
+    
+    def op_jump_if_false(self, target: int) -> Optional[int]:
+        if not is_truthy(self._stack.pop()):
+            return target
+        return None
     
-    def eval_unary(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a unary operation."""
-        op = node['op']
-        operand = self.evaluate(node['operand'])
-        
-        if op == '-':
-            return -operand
-        elif op == '!':
-            return not self._is_truthy(operand)
-        else:
-            raise RuntimeError(f"Unknown unary operator: {op}", node)
+    def op_jump_if_false_or_pop(self, target: int) -> Optional[int]:
+        if not is_truthy(self._stack[-1]):
+            return target
+        self._stack.pop()
+        return None
     
-    def eval_number(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a number literal."""
-        return node['value']
+    def op_jump_if_true_or_pop(self, target: int) -> Optional[int]:
+        if is_truthy(self._stack[-1]):
+            return target
+        self._stack.pop()
+        return None
     
-    def eval_string(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a string literal."""
-        return node['value']
+    def _print_value(self, value: Any):
+        if self._echo:
+            value = str(value)
+            print(value)
+        self._output.append(value)
     
-    def eval_boolean(self, node: Dict[str, Any]) -> Any:
-        """Evaluate a boolean literal."""
-        return node['value']
+    def op_print(self, arg):
+        self._print_value(self._stack.pop())
     
-    def eval_identifier(self, node: Dict[str, Any]) -> Any:
-        """Evaluate an identifier (variable reference)."""
-        name = node['name']
-        try:
-            return self.env.get(name)
-        except KeyError:
-            raise RuntimeError(f"Undefined variable: {name}", node)
-    
-    def _is_truthy(self, value: Any) -> bool:
-        """Determine if a value is truthy."""
-        if value is None:
-            return False
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, (int, float)):
-            return value != 0
-        if isinstance(value, str):
-            return len(value) > 0
-        return True
+    def op_pop(self, arg):
+        self._stack.pop()
+    
+    def op_dup(self, arg):
+        self._stack.append(self._stack[-1])
+    
+    def op_store_result(self, arg):
+        self._result = self._stack.pop()
+    
+    def op_loop_test(self, arg: Tuple[int, int, int, int]) -> Optional[int]:
+        slot, op_id, index, target = arg
+        value = self._globals[slot]
+        if value is UNSET:
+            raise self._undefined(slot)
+        if not BINOP_TABLE[op_id](value, self._consts[index]):
+            return target
+        return None
+    
+    def op_increment(self, arg: Tuple[int, int, int]):
+        slot, op_id, index = arg
+        value = self._globals[slot]
+        if value is UNSET:
+            raise self._undefined(slot)
+        self._globals[slot] = BINOP_TABLE[op_id](value, self._consts[index])
+    
+    def op_increment_watched(self, arg: Tuple[Tuple[int, int, int], int]):
+        """INCREMENT when a watch is set: step, then notify if watched."""
+        arg, pc = arg
+        self.op_increment(arg)
+        slot = arg[0]
+        if slot == self._watch_slot:
+            self._notify_watch(self._globals[slot], pc)
 
 
 def evaluate(ast_or_source, env: Optional[Dict[str, Any]] = None, 
              watch: Optional[str] = None,
-             watch_callback: Optional[Callable] = None) -> Any:
+             watch_callback: Optional[Callable] = None,
+             echo: bool = True) -> Any:
     """
     Evaluate an AST or source code.
     
     Args:
-        ast_or_source: Either an AST dict or source code string
+        ast_or_source: Either an AST node or source code string
         env: Optional initial environment (dict of variables)
         watch: Optional variable name to watch for changes
         watch_callback: Optional callback for watch notifications
+        echo: Whether print statements write to stdout
         
     Returns:
         The result of evaluation
@@ -325,7 +566,7 @@ def evaluate(ast_or_source, env: Optional[Dict[str, Any]] = None,
         environment.set_watch(watch, watch_callback)
     
     # Evaluate
-    evaluator = Evaluator(environment)
+    evaluator = Evaluator(environment, echo=echo)
     return evaluator.evaluate(ast)
 
 
@@ -418,6 +659,107 @@ x = 3"""
     print("✓ test_watch_with_location passed")
 
 
+def test_watch_in_loop_block():
+    """Test that assignments inside loop blocks notify exactly once each."""
+    watched_changes = []
+    
+    def on_change(name, value, line, col):
+        watched_changes.append(value)
+    
+    evaluate("x = 0; while (x < 3) { { x = x + 1 } }",
+             watch='x', watch_callback=on_change)
+    
+    assert watched_changes == [0, 1, 2, 3]
+    print("✓ test_watch_in_loop_block passed")
+
+
+def test_break_continue():
+    source = """
+    i = 0; total = 0
+    while (i < 10) {
+        i = i + 1
+        if (i % 2 == 0) continue
+        if (i > 7) break
+        total = total + i
+    }
+    total
+    """
+    assert evaluate(source) == 1 + 3 + 5 + 7
+    print("✓ test_break_continue passed")
+
+
+def test_print_output():
+    from parser import parse
+    evaluator = Evaluator(echo=False)
+    evaluator.evaluate(parse("print 1; print 'a' + 2; print TRUE; print 0.5"))
+    assert evaluator.output == ['1', 'a2', 'True', '0.5']
+    print("✓ test_print_output passed")
+
+
+def test_eval_error():
+    try:
+        evaluate("x = 1\ny = x / 0")
+        assert False, "Expected EvalError"
+    except EvalError as e:
+        assert e.message == "Division by zero"
+        assert str(e) == "Runtime error at line 2, column 7: Division by zero"
+    print("✓ test_eval_error passed")
+
+
+def test_reevaluate_ast():
+    # One AST evaluated repeatedly, against environments that give its
+    # variables different slots, and in every tier
+    from parser import parse
+    ast = parse("i = 0; while (i < 3) { i = i + 1 }; i")
+    changes = []
+    assert evaluate(ast, watch='i', watch_callback=lambda *args: changes.append(args)) == 3
+    assert evaluate(ast, env={'z': 100}) == 3
+    env = Environment()
+    env.define('y', 7)
+    env.define('z', 100)
+    evaluator = Evaluator(env)
+    evaluator.use_jit = evaluator.use_codegen = False
+    assert evaluator.evaluate(ast) == 3
+    assert evaluate(ast) == 3
+    assert len(changes) == 4
+    print("✓ test_reevaluate_ast passed")
+
+
+def test_variables_view():
+    # env.variables is a live view: writes through it reach the program
+    from parser import parse
+    env = Environment()
+    env.variables['x'] = 4
+    assert Evaluator(env, echo=False).evaluate(parse("x = x * 2; x")) == 8
+    assert env.variables['x'] == 8 and dict(env.variables) == {'x': 8}
+    del env.variables['x']
+    assert not env.exists('x') and len(env.variables) == 0
+    
+    # Variables defined in a nested scope are visible, and shadow outer ones
+    child = Environment(Environment())
+    child.parent.define('a', 1)
+    child.parent.define('b', 2)
+    child.define('b', 10)
+    for jit in (False, True):
+        evaluator = Evaluator(child, echo=False)
+        evaluator.use_jit = evaluator.use_codegen = jit
+        assert evaluator.evaluate(parse("b = b + a; c = b; c")) == 11 + jit
+    assert child.variables == {'b': 12}
+    assert child.parent.variables == {'a': 1, 'b': 2, 'c': 12}
+    print("✓ test_variables_view passed")
+
+
+def test_tier_choice():
+    # With the Numba tier on, programs it rejects still run as generated Python
+    from parser import parse
+    evaluator = Evaluator(Environment(), echo=False)
+    evaluator.use_jit = evaluator.use_codegen = True
+    assert evaluator.evaluate(parse("s = 'a' + 1; print s; s")) == 'a1'
+    assert evaluator._code is None  # The bytecode loop never ran
+    assert evaluator.evaluate(parse("x = 2 * 3; x")) == 6
+    print("✓ test_tier_choice passed")
+
+
 if __name__ == "__main__":
     test_evaluate_number()
     test_evaluate_arithmetic()
@@ -427,4 +769,11 @@ if __name__ == "__main__":
     test_evaluate_while()
     test_watch_variable()
     test_watch_with_location()
+    test_watch_in_loop_block()
+    test_break_continue()
+    test_print_output()
+    test_eval_error()
+    test_reevaluate_ast()
+    test_variables_view()
+    test_tier_choice()
     print("\nAll evaluator tests passed!")
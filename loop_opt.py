@@ -0,0 +1,195 @@
+"""
+loop_opt.py - Counted Loop Optimization
+
+Runs between the resolver and the compiler and recognizes the idiomatic
+counted loop:
+
+    while (i < 10) { ...; i = i + 1; ... }
+
+i.e. a while whose condition compares a variable with a literal and whose
+body steps that variable by a literal exactly once, as a top-level statement.
+Such loops are rewritten to a CountedLoopNode, and the step to an
+IncrementNode. The compiler lowers the pair to two fused instructions (a
+compare-and-branch on the variable, and an in-place step), so each iteration
+runs three instructions of loop overhead instead of nine.
+
+The rewrite does not change behavior: the fused instructions apply the same
+operators, in the same order, and the step still reports to variable watches.
+"""
+
+from copy import copy
+from typing import Optional
+
+from parser import (
+    Node, ProgramNode, BlockNode, AssignNode, IfNode, WhileNode,
+    BinaryNode, IdentifierNode, NumberNode,
+)
+
+
+# Comparisons that can drive a counted loop, and operators that can step it
+LOOP_COMPARISONS = frozenset(('<', '<=', '>', '>=', '!='))
+LOOP_STEPS = frozenset(('+', '-'))
+
+
+class CountedLoopNode(WhileNode):
+    """A while loop over ``name <op> limit``; ``increment`` steps the variable."""
+    __slots__ = ('name', 'slot', 'op', 'limit', 'increment')
+    tag = 'counted_loop'
+    _fields = ('name', 'op', 'limit', 'body')
+
+    def __init__(self, loop: WhileNode, increment: 'IncrementNode'):
+        super().__init__(loop.condition, loop.body, loop.line, loop.column)
+        condition = loop.condition
+        self.name: str = condition.left.name
+        self.slot: int = condition.left.slot
+        self.op: str = condition.op
+        self.limit = condition.right.value
+        self.increment = increment
+
+
+class IncrementNode(AssignNode):
+    """The statement ``name = name <op> step`` of a counted loop."""
+    __slots__ = ('op', 'step')
+    tag = 'increment'
+    _fields = ('name', 'op', 'step')
+
+    def __init__(self, assign: AssignNode):
+        super().__init__(assign.name, assign.value, assign.line, assign.column)
+        self.slot = assign.slot
+        self.op: str = assign.value.op
+        self.step = assign.value.right.value
+
+
+def _is_variable(node: Optional[Node], name: str) -> bool:
+    return type(node) is IdentifierNode and node.name == name
+
+
+def _is_step(node: Node, name: str) -> bool:
+    """Check for ``name = name + k`` (or ``- k``) with a literal number k."""
+    if type(node) is not AssignNode or node.name != name:
+        return False
+    value = node.value
+    return (type(value) is BinaryNode and value.op in LOOP_STEPS
+            and _is_variable(value.left, name)
+            and type(value.right) is NumberNode)
+
+
+def _count_assignments(node: Optional[Node], name: str) -> int:
+    """Count the assignments to name in a statement tree."""
+    if isinstance(node, AssignNode):
+        return node.name == name
+    if isinstance(node, BlockNode):
+        return sum(_count_assignments(stmt, name) for stmt in node.statements)
+    if isinstance(node, IfNode):
+        return _count_assignments(node.then, name) + _count_assignments(node.else_, name)
+    if isinstance(node, WhileNode):
+        return _count_assignments(node.body, name)
+    return 0
+
+
+def _optimize_while(node: WhileNode) -> WhileNode:
+    condition = node.condition
+    if not (type(condition) is BinaryNode and condition.op in LOOP_COMPARISONS
+            and type(condition.left) is IdentifierNode
+            and type(condition.right) is NumberNode):
+        return node
+    name = condition.left.name
+    if _count_assignments(node.body, name) != 1:
+        return node
+
+    body = node.body
+    if _is_step(body, name):
+        increment = body = IncrementNode(body)
+    elif type(body) is BlockNode:
+        statements = list(body.statements)
+        for i, stmt in enumerate(statements):
+            if _is_step(stmt, name):
+                increment = statements[i] = IncrementNode(stmt)
+                break
+        else:
+            return node
+        body = copy(body)
+        body.statements = statements
+    else:
+        return node
+    loop = copy(node)
+    loop.body = body
+    return CountedLoopNode(loop, increment)
+
+
+def optimize_loops(node: Optional[Node]) -> Optional[Node]:
+    """
+    Rewrite counted loops in a resolved AST.
+
+    The given AST is not changed: the nodes on the path to a rewritten loop
+    are copied, so the same AST can be resolved and compiled again (e.g.
+    against another environment). Returns the (possibly replaced) node.
+    """
+    kind = type(node)
+    if kind is ProgramNode or kind is BlockNode:
+        statements = [optimize_loops(stmt) for stmt in node.statements]
+        if any(new is not old for new, old in zip(statements, node.statements)):
+            node = copy(node)
+            node.statements = statements
+    elif kind is IfNode:
+        then = optimize_loops(node.then)
+        else_ = optimize_loops(node.else_)
+        if then is not node.then or else_ is not node.else_:
+            node = copy(node)
+            node.then = then
+            node.else_ = else_
+    elif kind is WhileNode:
+        body = optimize_loops(node.body)
+        if body is not node.body:
+            node = copy(node)
+            node.body = body
+        return _optimize_while(node)
+    return node
+
+
+# Test functions
+def test_counted_loop():
+    from parser import parse
+    from resolver import resolve
+    ast = optimize_loops(resolve(parse("i = 0; while (i < 10) { s = i; i = i + 2 }")))
+    loop = ast.statements[1]
+    assert type(loop) is CountedLoopNode
+    assert (loop.name, loop.op, loop.limit) == ('i', '<', 10)
+    assert loop.body.statements[1] is loop.increment
+    assert (loop.increment.op, loop.increment.step) == ('+', 2)
+    print("✓ test_counted_loop passed")
+
+
+def test_ast_unchanged():
+    from parser import parse
+    from resolver import resolve
+    ast = resolve(parse("if (x) { while (i < 3) { i = i + 1 } }"))
+    before = repr(ast)
+    optimized = optimize_loops(ast)
+    assert type(optimized.statements[0].then.statements[0]) is CountedLoopNode
+    assert repr(ast) == before
+    assert type(ast.statements[0].then.statements[0]) is WhileNode
+    print("✓ test_ast_unchanged passed")
+
+
+def test_not_counted():
+    from parser import parse
+    from resolver import resolve
+    sources = [
+        "while (i < n) { i = i + 1 }",                  # limit is not a literal
+        "while (i < 10) { i = i * 2 }",                 # not a step
+        "while (i < 10) { i = i + 1; i = i + 1 }",      # stepped twice
+        "while (i < 10) { if (i) { i = i + 1 } }",      # step is nested
+        "while (i < 10) { while (i < 5) { i = i + 1 } }",
+    ]
+    for source in sources:
+        ast = optimize_loops(resolve(parse(source)))
+        assert type(ast.statements[0]) is WhileNode, source
+    print("✓ test_not_counted passed")
+
+
+if __name__ == "__main__":
+    test_counted_loop()
+    test_not_counted()
+    test_ast_unchanged()
+    print("\nAll loop optimization tests passed!")
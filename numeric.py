@@ -0,0 +1,482 @@
+"""
+numeric.py - Numba-Compiled Tier for Numeric Programs
+
+Programs that only work with numbers (no strings, no print, no watch) can
+run their bytecode in a typed kernel instead of the Python dispatch loop.
+When Numba is installed the kernel is compiled with @njit(cache=True) so the
+LLVM cost is paid once per machine and reused across imports.
+
+Variables are read from and written back to the root environment's slot
+list, using the slots assigned by resolver.py.
+
+Values are kept in three parallel lanes (type tag, int64, float64) so the
+kernel reproduces Python's int/float/bool results exactly. Anything the
+kernel cannot reproduce exactly (big integers, division by zero, undefined
+variables, ...) makes it bail out, and the caller reruns the program in the
+Python interpreter. Eligible programs have no side effects, so the rerun is
+always safe.
+"""
+
+from typing import Any, List, Optional, Tuple
+
+from compiler import (
+    Code,
+    OP_LOAD_CONST, OP_LOAD_NAME, OP_STORE_NAME, OP_BINARY, OP_NEG, OP_NOT,
+    OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_FALSE_OR_POP, OP_JUMP_IF_TRUE_OR_POP,
+    OP_POP, OP_DUP, OP_STORE_RESULT, OP_LOOP_TEST, OP_INCREMENT,
+)
+from resolver import UNSET
+from operators import (
+    BINOP_ADD, BINOP_SUB, BINOP_MUL, BINOP_MOD,
+    BINOP_EQ, BINOP_NE, BINOP_LT, BINOP_GT, BINOP_LE, BINOP_GE,
+)
+
+try:
+    import numba
+    import numpy as np
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    np = None
+    NUMBA_AVAILABLE = False
+
+
+def _njit(func):
+    """Compile with Numba when available, otherwise run as plain Python."""
+    if numba is None:
+        return func
+    return numba.njit(cache=True, boundscheck=False)(func)
+
+
+# Value type tags
+T_INT = 0
+T_FLOAT = 1
+T_BOOL = 2
+T_NONE = 3
+
+# Kernel exit status
+STATUS_OK = 0
+STATUS_BAIL = 1
+
+
+# Each instruction's operands occupy ARG_WIDTH consecutive entries of the
+# args array; most instructions only use the first
+ARG_WIDTH = 4
+
+# Integers are kept well inside int64 so no operation can silently wrap,
+# and inside float64's exact range so int/float comparisons stay exact.
+INT_LIMIT = 2 ** 53
+
+NUMERIC_OPCODES = frozenset((
+    OP_LOAD_CONST, OP_LOAD_NAME, OP_STORE_NAME, OP_BINARY, OP_NEG, OP_NOT,
+    OP_JUMP, OP_JUMP_IF_FALSE, OP_JUMP_IF_FALSE_OR_POP, OP_JUMP_IF_TRUE_OR_POP,
+    OP_POP, OP_DUP, OP_STORE_RESULT, OP_LOOP_TEST, OP_INCREMENT,
+))
+
+
+@_njit
+def _truthy(tag, ival, fval):
+    if tag == T_FLOAT:
+        return fval != 0.0
+    if tag == T_NONE:
+        return False
+    return ival != 0
+
+
+@_njit
+def _binary(op, ltag, li, lf, rtag, ri, rf):
+    """Apply a binary operator by id. Returns (ok, tag, ival, fval)."""
+    if ltag == T_NONE or rtag == T_NONE:
+        return False, T_NONE, 0, 0.0
+
+    # The ladders test the operators loops use most first: '+' and the
+    # comparisons that bound and step a loop, then the rest
+    if ltag != T_FLOAT and rtag != T_FLOAT:
+        # int/bool operands (bools hold 0 or 1 in the int lane)
+        if op == BINOP_ADD:
+            result = li + ri
+        elif op == BINOP_LT:
+            return True, T_BOOL, int(li < ri), 0.0
+        elif op == BINOP_SUB:
+            result = li - ri
+        elif op == BINOP_LE:
+            return True, T_BOOL, int(li <= ri), 0.0
+        elif op == BINOP_EQ:
+            return True, T_BOOL, int(li == ri), 0.0
+        elif op == BINOP_GT:
+            return True, T_BOOL, int(li > ri), 0.0
+        elif op == BINOP_GE:
+            return True, T_BOOL, int(li >= ri), 0.0
+        elif op == BINOP_NE:
+            return True, T_BOOL, int(li != ri), 0.0
+        elif op == BINOP_MUL:
+            if abs(float(li) * float(ri)) >= INT_LIMIT:
+                return False, T_NONE, 0, 0.0
+            result = li * ri
+        elif op == BINOP_MOD:
+            if ri == 0:
+                return False, T_NONE, 0, 0.0
+            result = li % ri
+        else:
+            if ri == 0:
+                return False, T_NONE, 0, 0.0
+            return True, T_FLOAT, 0, li / ri
+        if result >= INT_LIMIT or result <= -INT_LIMIT:
+            return False, T_NONE, 0, 0.0
+        return True, T_INT, result, 0.0
+
+    a = lf if ltag == T_FLOAT else float(li)
+    b = rf if rtag == T_FLOAT else float(ri)
+    if op == BINOP_ADD:
+        return True, T_FLOAT, 0, a + b
+    elif op == BINOP_LT:
+        return True, T_BOOL, int(a < b), 0.0
+    elif op == BINOP_SUB:
+        return True, T_FLOAT, 0, a - b
+    elif op == BINOP_LE:
+        return True, T_BOOL, int(a <= b), 0.0
+    elif op == BINOP_EQ:
+        return True, T_BOOL, int(a == b), 0.0
+    elif op == BINOP_GT:
+        return True, T_BOOL, int(a > b), 0.0
+    elif op == BINOP_GE:
+        return True, T_BOOL, int(a >= b), 0.0
+    elif op == BINOP_NE:
+        return True, T_BOOL, int(a != b), 0.0
+    elif op == BINOP_MUL:
+        return True, T_FLOAT, 0, a * b
+    elif op == BINOP_MOD:
+        if b == 0.0:
+            return False, T_NONE, 0, 0.0
+        return True, T_FLOAT, 0, a % b
+    else:
+        if b == 0.0:
+            return False, T_NONE, 0, 0.0
+        return True, T_FLOAT, 0, a / b
+
+
+@_njit
+def run_numeric(ops, args, ctags, cints, cfloats,
+                vtags, vints, vfloats, vset,
+                stags, sints, sfloats):
+    """
+    Run numeric bytecode.
+
+    Variables live in the v* arrays, indexed by their resolved slot; vset[i]
+    is 1 once slot i holds a value. The s* arrays are the preallocated value
+    stack. Instruction pc's operands are args[pc * ARG_WIDTH:][:ARG_WIDTH].
+
+    Returns:
+        (status, pc, result_tag, result_int, result_float)
+    """
+    n = len(ops)
+    pc = 0
+    sp = 0
+    rtag = T_NONE
+    rint = 0
+    rfloat = 0.0
+
+    while pc < n:
+        op = ops[pc]
+        base = pc * ARG_WIDTH
+        arg = args[base]
+        pc += 1
+
+        if op == OP_LOAD_CONST:
+            stags[sp] = ctags[arg]
+            sints[sp] = cints[arg]
+            sfloats[sp] = cfloats[arg]
+            sp += 1
+        elif op == OP_LOAD_NAME:
+            if vset[arg] == 0:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            stags[sp] = vtags[arg]
+            sints[sp] = vints[arg]
+            sfloats[sp] = vfloats[arg]
+            sp += 1
+        elif op == OP_STORE_NAME:
+            sp -= 1
+            vset[arg] = 1
+            vtags[arg] = stags[sp]
+            vints[arg] = sints[sp]
+            vfloats[arg] = sfloats[sp]
+        elif op == OP_JUMP:
+            pc = arg
+        elif op == OP_JUMP_IF_FALSE:
+            sp -= 1
+            if not _truthy(stags[sp], sints[sp], sfloats[sp]):
+                pc = arg
+        elif op == OP_JUMP_IF_FALSE_OR_POP:
+            if not _truthy(stags[sp - 1], sints[sp - 1], sfloats[sp - 1]):
+                pc = arg
+            else:
+                sp -= 1
+        elif op == OP_JUMP_IF_TRUE_OR_POP:
+            if _truthy(stags[sp - 1], sints[sp - 1], sfloats[sp - 1]):
+                pc = arg
+            else:
+                sp -= 1
+        elif op == OP_NEG:
+            tag = stags[sp - 1]
+            if tag == T_FLOAT:
+                sfloats[sp - 1] = -sfloats[sp - 1]
+            elif tag == T_NONE:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            else:
+                stags[sp - 1] = T_INT
+                sints[sp - 1] = -sints[sp - 1]
+        elif op == OP_NOT:
+            truth = _truthy(stags[sp - 1], sints[sp - 1], sfloats[sp - 1])
+            stags[sp - 1] = T_BOOL
+            sints[sp - 1] = 0 if truth else 1
+        elif op == OP_POP:
+            sp -= 1
+        elif op == OP_DUP:
+            stags[sp] = stags[sp - 1]
+            sints[sp] = sints[sp - 1]
+            sfloats[sp] = sfloats[sp - 1]
+            sp += 1
+        elif op == OP_STORE_RESULT:
+            sp -= 1
+            rtag = stags[sp]
+            rint = sints[sp]
+            rfloat = sfloats[sp]
+        elif op == OP_BINARY:
+            sp -= 1
+            ok, tag, ival, fval = _binary(arg, stags[sp - 1], sints[sp - 1], sfloats[sp - 1],
+                                          stags[sp], sints[sp], sfloats[sp])
+            if not ok:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            stags[sp - 1] = tag
+            sints[sp - 1] = ival
+            sfloats[sp - 1] = fval
+        elif op == OP_LOOP_TEST:
+            slot = args[base + 1]
+            k = args[base + 3]
+            if vset[slot] == 0:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            ok, tag, ival, fval = _binary(args[base + 2], vtags[slot], vints[slot], vfloats[slot],
+                                          ctags[k], cints[k], cfloats[k])
+            if not ok:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            if not _truthy(tag, ival, fval):
+                pc = arg
+        elif op == OP_INCREMENT:
+            k = args[base + 2]
+            if vset[arg] == 0:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            ok, tag, ival, fval = _binary(args[base + 1], vtags[arg], vints[arg], vfloats[arg],
+                                          ctags[k], cints[k], cfloats[k])
+            if not ok:
+                return STATUS_BAIL, pc - 1, rtag, rint, rfloat
+            vtags[arg] = tag
+            vints[arg] = ival
+            vfloats[arg] = fval
+
+    return STATUS_OK, pc, rtag, rint, rfloat
+
+
+class NumericProgram:
+    """Bytecode lowered to typed arrays."""
+
+    def __init__(self, ops, args, ctags, cints, cfloats):
+        self.ops = ops
+        self.args = args
+        self.ctags = ctags
+        self.cints = cints
+        self.cfloats = cfloats
+
+
+def _array(kind: str, values: List[Any]):
+    """Build a typed array for the kernel (a plain list without NumPy)."""
+    if np is None:
+        return list(values)
+    return np.array(values, dtype=kind)
+
+
+def _split_value(value: Any) -> Optional[Tuple[int, int, float]]:
+    """Split a Python value into (tag, int, float) lanes, or None if unsupported."""
+    if value is None:
+        return T_NONE, 0, 0.0
+    if type(value) is bool:
+        return T_BOOL, int(value), 0.0
+    if type(value) is int:
+        if -INT_LIMIT < value < INT_LIMIT:
+            return T_INT, value, 0.0
+        return None
+    if type(value) is float:
+        return T_FLOAT, 0, value
+    return None
+
+
+def _join_value(tag: int, ival: int, fval: float) -> Any:
+    """Rebuild a Python value from its lanes."""
+    if tag == T_INT:
+        return int(ival)
+    if tag == T_FLOAT:
+        return float(fval)
+    if tag == T_BOOL:
+        return ival != 0
+    return None
+
+
+def lower(code: Code) -> Optional[NumericProgram]:
+    """
+    Lower a Code object to typed arrays, or return None if it is not numeric.
+
+    A program is numeric if it only uses the opcodes above (in particular no
+    print) and every constant is a number, a boolean or None.
+    """
+    consts = []
+    for value in code.consts:
+        split = _split_value(value)
+        if split is None:
+            return None
+        consts.append(split)
+
+    if not NUMERIC_OPCODES.issuperset(code.ops):
+        return None
+
+    args = []
+    for op, arg in zip(code.ops, code.args):
+        if op == OP_LOOP_TEST:
+            slot, op_id, index, target = arg
+            args.extend((target, slot, op_id, index))
+        elif op == OP_INCREMENT:
+            args.extend(arg + (0,))
+        else:
+            args.extend((arg or 0, 0, 0, 0))
+
+    return NumericProgram(
+        _array('int32', code.ops),
+        _array('int64', args),
+        _array('int8', [c[0] for c in consts]),
+        _array('int64', [c[1] for c in consts]),
+        _array('float64', [c[2] for c in consts]),
+    )
+
+
+def _lowered(code: Code) -> Optional[NumericProgram]:
+    """lower(code), computed once and cached on the Code object."""
+    program = getattr(code, 'numeric', False)
+    if program is False:
+        program = code.numeric = lower(code)
+    return program
+
+
+def accepts(code: Code) -> bool:
+    """Whether the kernel can run code (it may still bail at run time)."""
+    return _lowered(code) is not None
+
+
+def run_program(code: Code, root) -> Tuple[bool, Any]:
+    """
+    Try to run a program in the numeric kernel.
+
+    Variables are read from the root environment's slots and written back to
+    them on success.
+
+    Args:
+        code: The compiled program
+        root: The root Environment, already holding a slot for each of
+            code.names (must have no watch set)
+
+    Returns:
+        (True, result) if the kernel ran the program, (False, None) if the
+        caller must run it in the Python interpreter instead
+    """
+    program = _lowered(code)
+    if program is None:
+        return False, None
+
+    tags, ints, floats, is_set = [], [], [], []
+    for value in root.values:
+        if value is UNSET:
+            split = (T_INT, 0, 0.0)
+            is_set.append(0)
+        else:
+            split = _split_value(value)
+            if split is None or split[0] == T_NONE:
+                return False, None
+            is_set.append(1)
+        tags.append(split[0])
+        ints.append(split[1])
+        floats.append(split[2])
+
+    vtags = _array('int8', tags)
+    vints = _array('int64', ints)
+    vfloats = _array('float64', floats)
+    vset = _array('uint8', is_set)
+
+    # Every instruction pushes at most one value
+    stack_size = len(program.ops) + 1
+    stags = _array('int8', [0] * stack_size)
+    sints = _array('int64', [0] * stack_size)
+    sfloats = _array('float64', [0.0] * stack_size)
+
+    status, _, rtag, rint, rfloat = run_numeric(
+        program.ops, program.args, program.ctags, program.cints, program.cfloats,
+        vtags, vints, vfloats, vset, stags, sints, sfloats)
+    if status != STATUS_OK:
+        return False, None
+
+    values = root.values
+    for slot in range(len(values)):
+        if vset[slot]:
+            values[slot] = _join_value(vtags[slot], vints[slot], vfloats[slot])
+
+    return True, _join_value(rtag, rint, rfloat)
+
+
+# Test functions
+def _run(source: str):
+    from compiler import compile_ast
+    from evaluator import Environment
+    env = Environment()
+    code = compile_ast(source)
+    for name in code.names:
+        env.declare(name)
+    return run_program(code, env), env
+
+
+def test_numeric_while():
+    (ok, result), env = _run("x = 0; while (x < 5) { x = x + 1 }; x")
+    assert ok and result == 5 and type(result) is int
+    assert env.get('x') == 5
+    print("✓ test_numeric_while passed")
+
+
+def test_numeric_types():
+    assert _run("10 / 4")[0] == (True, 2.5)
+    assert _run("x = 3; x > 2 && x < 5")[0] == (True, True)
+    assert _run("0 || 7")[0] == (True, 7)
+    assert _run("-TRUE")[0] == (True, -1)
+    assert _run("-7 % 3")[0] == (True, 2)
+    (ok, result), _ = _run("i = 0; s = 0.5; while (i < 4) { s = s * 2; i = i + 1 }; s")
+    assert ok and result == 8.0 and type(result) is float
+    print("✓ test_numeric_types passed")
+
+
+def test_numeric_block_scope():
+    # Assignments inside blocks create top-level variables
+    (ok, result), env = _run("x = 1; { y = 2; x = y + 1 }; y")
+    assert ok and result == 2
+    assert env.get('x') == 3 and env.get('y') == 2
+    assert _run("y = x")[0] == (False, None)
+    print("✓ test_numeric_block_scope passed")
+
+
+def test_numeric_bails_out():
+    assert _run("print 1")[0] == (False, None)
+    assert _run("x = 'a'")[0] == (False, None)
+    assert _run("1 / 0")[0] == (False, None)
+    assert _run("x = 1; while (x > 0) { x = x * 1000 }")[0] == (False, None)
+    print("✓ test_numeric_bails_out passed")
+
+
+if __name__ == "__main__":
+    test_numeric_while()
+    test_numeric_types()
+    test_numeric_block_scope()
+    test_numeric_bails_out()
+    print("\nAll numeric tests passed!")
@@ -0,0 +1,109 @@
+"""
+operators.py - Operator Semantics
+
+The single definition of what each operator does, shared by every stage that
+computes values. Binary operators are identified by small integer ids so the
+evaluator indexes a table of C-implemented callables instead of comparing
+operator strings.
+"""
+
+import operator
+from typing import Any, Callable, Dict, List
+
+
+class OperatorError(Exception):
+    """Exception raised for language-level operator errors (e.g. division by zero)."""
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+def is_truthy(value: Any) -> bool:
+    """Determine if a value is truthy."""
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        return len(value) > 0
+    return True
+
+
+def add(left: Any, right: Any) -> Any:
+    """'+' concatenates when either side is a string."""
+    if isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    return left + right
+
+
+def divide(left: Any, right: Any) -> Any:
+    if right == 0:
+        raise OperatorError("Division by zero")
+    return left / right
+
+
+def logical_not(value: Any) -> bool:
+    return not is_truthy(value)
+
+
+# Binary operators, indexed by id
+BINARY_OPERATORS = ('+', '-', '*', '/', '%', '==', '!=', '<', '>', '<=', '>=')
+
+(BINOP_ADD, BINOP_SUB, BINOP_MUL, BINOP_DIV, BINOP_MOD,
+ BINOP_EQ, BINOP_NE, BINOP_LT, BINOP_GT, BINOP_LE, BINOP_GE) = range(len(BINARY_OPERATORS))
+
+BINARY_OP_IDS: Dict[str, int] = {op: i for i, op in enumerate(BINARY_OPERATORS)}
+
+BINOP_TABLE: List[Callable[[Any, Any], Any]] = [
+    add,
+    operator.sub,
+    operator.mul,
+    divide,
+    operator.mod,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.gt,
+    operator.le,
+    operator.ge,
+]
+
+UNARY_OPERATORS: Dict[str, Callable[[Any], Any]] = {
+    '-': operator.neg,
+    '!': logical_not,
+}
+
+
+# Test functions
+def test_binop_table():
+    assert len(BINOP_TABLE) == len(BINARY_OPERATORS)
+    assert BINOP_TABLE[BINARY_OP_IDS['+']](2, 3) == 5
+    assert BINOP_TABLE[BINARY_OP_IDS['+']]('a', 1) == 'a1'
+    assert BINOP_TABLE[BINARY_OP_IDS['<=']](3, 3) is True
+    print("✓ test_binop_table passed")
+
+
+def test_divide_by_zero():
+    try:
+        divide(1, 0)
+    except OperatorError as e:
+        assert e.message == "Division by zero"
+    else:
+        assert False, "Expected OperatorError"
+    print("✓ test_divide_by_zero passed")
+
+
+def test_truthiness():
+    assert not is_truthy(0) and not is_truthy('') and not is_truthy(None)
+    assert is_truthy(0.5) and is_truthy('a') and is_truthy(True)
+    assert UNARY_OPERATORS['!'](0) is True
+    print("✓ test_truthiness passed")
+
+
+if __name__ == "__main__":
+    test_binop_table()
+    test_divide_by_zero()
+    test_truthiness()
+    print("\nAll operator tests passed!")
@@ -3,10 +3,188 @@ parser.py - Recursive Descent Parser with Location Tracking
 
 Parses tokens into an Abstract Syntax Tree (AST) where each node
 contains source location information.
+
+Each node kind is its own class with ``__slots__``, so a node is a small
+fixed-layout object and field access is a slot lookup rather than a dict
+probe. Nodes still answer ``node['field']`` and ``node.get('field')`` for
+code written against the original dict-based AST.
 """
 
-from typing import List, Dict, Any, Optional
-from tokenizer import Token, tokenize
+import re
+from typing import List, Any, Optional, Union
+from tokenizer import Token, TokenStream, tokenize
+from operators import (
+    BINARY_OP_IDS, BINOP_TABLE, BINOP_ADD, BINOP_MUL, BINOP_MOD, UNARY_OPERATORS, is_truthy,
+)
+
+
+# Escape sequences recognized in string literals
+_ESCAPE_RE = re.compile(r'\\([nt"\'])')
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', "'": "'"}
+
+
+def _unescape(match: re.Match) -> str:
+    return _ESCAPES[match.group(1)]
+
+
+class Node:
+    """Base class of AST nodes."""
+    __slots__ = ('line', 'column')
+    tag = ''
+    _fields: tuple = ()
+    
+    def __init__(self, line: int, column: int):
+        self.line = line
+        self.column = column
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+    
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields}, line={self.line}, column={self.column})"
+
+
+class ProgramNode(Node):
+    __slots__ = ('statements', 'names')
+    tag = 'program'
+    _fields = ('statements',)
+    
+    def __init__(self, statements: List[Node], line: int, column: int):
+        super().__init__(line, column)
+        self.statements = statements
+        self.names: tuple = ()  # Set by the resolver
+
+
+class BlockNode(Node):
+    __slots__ = ('statements',)
+    tag = 'block'
+    _fields = ('statements',)
+    
+    def __init__(self, statements: List[Node], line: int, column: int):
+        super().__init__(line, column)
+        self.statements = statements
+
+
+class AssignNode(Node):
+    __slots__ = ('name', 'value', 'slot')
+    tag = 'assign'
+    _fields = ('name', 'value')
+    
+    def __init__(self, name: str, value: Node, line: int, column: int):
+        super().__init__(line, column)
+        self.name = name
+        self.value = value
+        self.slot: Optional[int] = None  # Set by the resolver
+
+
+class PrintNode(Node):
+    __slots__ = ('value',)
+    tag = 'print'
+    _fields = ('value',)
+    
+    def __init__(self, value: Node, line: int, column: int):
+        super().__init__(line, column)
+        self.value = value
+
+
+class IfNode(Node):
+    __slots__ = ('condition', 'then', 'else_')
+    tag = 'if'
+    _fields = ('condition', 'then', 'else_')
+    
+    def __init__(self, condition: Node, then: Optional[Node], else_: Optional[Node],
+                 line: int, column: int):
+        super().__init__(line, column)
+        self.condition = condition
+        self.then = then
+        self.else_ = else_
+
+
+class WhileNode(Node):
+    __slots__ = ('condition', 'body')
+    tag = 'while'
+    _fields = ('condition', 'body')
+    
+    def __init__(self, condition: Node, body: Optional[Node], line: int, column: int):
+        super().__init__(line, column)
+        self.condition = condition
+        self.body = body
+
+
+class BinaryNode(Node):
+    __slots__ = ('op', 'left', 'right')
+    tag = 'binary'
+    _fields = ('op', 'left', 'right')
+    
+    def __init__(self, op: str, left: Node, right: Node, line: int, column: int):
+        super().__init__(line, column)
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class UnaryNode(Node):
+    __slots__ = ('op', 'operand')
+    tag = 'unary'
+    _fields = ('op', 'operand')
+    
+    def __init__(self, op: str, operand: Node, line: int, column: int):
+        super().__init__(line, column)
+        self.op = op
+        self.operand = operand
+
+
+class LiteralNode(Node):
+    """Base class of constant nodes."""
+    __slots__ = ('value',)
+    _fields = ('value',)
+    
+    def __init__(self, value: Any, line: int, column: int):
+        super().__init__(line, column)
+        self.value = value
+
+
+class NumberNode(LiteralNode):
+    __slots__ = ()
+    tag = 'number'
+
+
+class StringNode(LiteralNode):
+    __slots__ = ()
+    tag = 'string'
+
+
+class BooleanNode(LiteralNode):
+    __slots__ = ()
+    tag = 'boolean'
+
+
+class BreakNode(Node):
+    __slots__ = ()
+    tag = 'break'
+
+
+class ContinueNode(Node):
+    __slots__ = ()
+    tag = 'continue'
+
+
+class IdentifierNode(Node):
+    __slots__ = ('name', 'slot')
+    tag = 'identifier'
+    _fields = ('name',)
+    
+    def __init__(self, name: str, line: int, column: int):
+        super().__init__(line, column)
+        self.name = name
+        self.slot: Optional[int] = None  # Set by the resolver
 
 
 class ParseError(Exception):
@@ -16,339 +194,414 @@ class ParseError(Exception):
         super().__init__(f"Parse error at line {token.line}, column {token.column}: {message}")
 
 
+# Binary operator precedence (higher binds tighter)
+_PREC = {
+    '||': 1,
+    '&&': 2,
+    '==': 3, '!=': 3,
+    '<': 4, '>': 4, '<=': 4, '>=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6, '%': 6,
+}
+
+
 class Parser:
     """
     Recursive descent parser for the language.
     
     Grammar (simplified):
         program     -> statement*
-        statement   -> assignment | print_stmt | if_stmt | while_stmt | block | expr_stmt
+        statement   -> assignment | print_stmt | if_stmt | while_stmt | block
+                     | break_stmt | continue_stmt | expr_stmt
         assignment  -> IDENTIFIER '=' expression ';'?
         print_stmt  -> 'print' expression ';'?
         if_stmt     -> 'if' '(' expression ')' statement ('else' statement)?
         while_stmt  -> 'while' '(' expression ')' statement
         block       -> '{' statement* '}'
+        break_stmt  -> 'break' ';'?
+        continue_stmt -> 'continue' ';'?
         expr_stmt   -> expression ';'?
-        expression  -> logical_or
-        logical_or  -> logical_and ('||' logical_and)*
-        logical_and -> equality ('&&' equality)*
-        equality    -> comparison (('==' | '!=') comparison)*
-        comparison  -> term (('<' | '>' | '<=' | '>=') term)*
-        term        -> factor (('+' | '-') factor)*
-        factor      -> unary (('*' | '/' | '%') unary)*
+        expression  -> unary (BINARY_OP unary)*
         unary       -> ('!' | '-') unary | primary
         primary     -> NUMBER | STRING | BOOLEAN | IDENTIFIER | '(' expression ')'
+    
+    Binary operators are parsed by precedence climbing over _PREC, from
+    loosest to tightest: ||, &&, == !=, < > <= >=, + -, * / %. All are
+    left-associative.
     """
     
-    def __init__(self, tokens: List[Token]):
+    # Token tags that start a unary expression
+    _UNARY_OPS = frozenset(('!', '-'))
+    
+    # Token tags that end a block's statement list
+    _BLOCK_END = frozenset(('}', 'EOF'))
+    
+    # Token tags that start a break or continue statement
+    _LOOP_JUMPS = frozenset(('break', 'continue'))
+    
+    def __init__(self, tokens: Union[TokenStream, List[Token]]):
+        if not isinstance(tokens, TokenStream):
+            tokens = TokenStream.from_tokens(tokens)
+        # The stream always ends with EOF. Parsing never moves past it, so
+        # self.tags[self.pos] needs no bounds check.
+        if not tokens.tags or tokens.tags[-1] != 'EOF':
+            last = len(tokens.tags) - 1
+            line = tokens.lines[last] if last >= 0 else 1
+            column = tokens.columns[last] if last >= 0 else 1
+            tokens = TokenStream.from_tokens(tokens)
+            tokens.append('EOF', '', line, column)
         self.tokens = tokens
+        # The parser reads the stream's arrays directly and only builds a
+        # Token when one is asked for (e.g. for an error)
+        self.tags = tokens.tags
+        self.values = tokens.values
+        self.lines = tokens.lines
+        self.columns = tokens.columns
         self.pos = 0
+        self._last = len(tokens) - 1
     
     def current(self) -> Token:
         """Get the current token."""
-        if self.pos < len(self.tokens):
-            return self.tokens[self.pos]
-        return self.tokens[-1]  # EOF
+        return self.tokens[self.pos]
     
     def peek(self, offset: int = 0) -> Token:
         """Look ahead at a token."""
-        idx = self.pos + offset
-        if idx < len(self.tokens):
-            return self.tokens[idx]
-        return self.tokens[-1]
+        return self.tokens[min(self.pos + offset, self._last)]
     
     def advance(self) -> Token:
         """Move to the next token and return the previous one."""
-        token = self.current()
-        if self.pos < len(self.tokens):
-            self.pos += 1
-        return token
+        pos = self.pos
+        if pos < self._last:
+            self.pos = pos + 1
+        return self.tokens[pos]
     
     def match(self, *tags: str) -> bool:
         """Check if current token matches any of the given tags."""
-        return self.current().tag in tags
+        return self.tags[self.pos] in tags
     
     def consume(self, tag: str, message: str) -> Token:
         """Consume a token of the expected type or raise an error."""
-        if self.current().tag == tag:
-            return self.advance()
-        raise ParseError(message, self.current())
-    
-    def make_node(self, tag: str, token: Token, **kwargs) -> Dict[str, Any]:
-        """Create an AST node with location information."""
-        return {
-            'tag': tag,
-            'line': token.line,
-            'column': token.column,
-            **kwargs
-        }
+        return self.tokens[self.expect(tag, message)]
+    
+    def expect(self, tag: str, message: str) -> int:
+        """Like consume(), but return the index of the consumed token."""
+        pos = self.pos
+        if self.tags[pos] == tag:
+            if pos < self._last:
+                self.pos = pos + 1
+            return pos
+        raise ParseError(message, self.tokens[pos])
+    
+    def skip_semicolon(self):
+        """Consume an optional ';'."""
+        if self.tags[self.pos] == ';':
+            self.pos += 1
     
     # ===== Parsing Methods =====
     
-    def parse(self) -> Dict[str, Any]:
+    def parse(self) -> Node:
         """Parse the entire program."""
         statements = []
-        start_token = self.current()
+        tags = self.tags
+        start = self.pos
         
-        while not self.match('EOF'):
+        while tags[self.pos] != 'EOF':
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
         
-        return self.make_node('program', start_token, statements=statements)
+        return fold(ProgramNode(statements, self.lines[start], self.columns[start]))
     
-    def parse_statement(self) -> Optional[Dict[str, Any]]:
+    def parse_statement(self) -> Optional[Node]:
         """Parse a single statement."""
+        tags = self.tags
+        
         # Skip semicolons
-        while self.match(';'):
-            self.advance()
+        while tags[self.pos] == ';':
+            self.pos += 1
         
-        if self.match('EOF'):
+        tag = tags[self.pos]
+        if tag == 'EOF':
             return None
         
-        if self.match('print'):
+        if tag == 'print':
             return self.parse_print()
-        elif self.match('if'):
+        elif tag == 'if':
             return self.parse_if()
-        elif self.match('while'):
+        elif tag == 'while':
             return self.parse_while()
-        elif self.match('{'):
+        elif tag == '{':
             return self.parse_block()
-        elif self.match('identifier') and self.peek(1).tag == '=':
+        elif tag in self._LOOP_JUMPS:
+            return self.parse_loop_jump()
+        elif tag == 'identifier' and tags[self.pos + 1] == '=':
             return self.parse_assignment()
         else:
             return self.parse_expression_statement()
     
-    def parse_assignment(self) -> Dict[str, Any]:
+    def parse_assignment(self) -> Node:
         """Parse an assignment statement: identifier = expression"""
-        name_token = self.consume('identifier', "Expected variable name")
-        self.consume('=', "Expected '=' in assignment")
+        name = self.expect('identifier', "Expected variable name")
+        self.expect('=', "Expected '=' in assignment")
         value = self.parse_expression()
         
         # Optional semicolon
-        if self.match(';'):
-            self.advance()
+        self.skip_semicolon()
         
-        return self.make_node('assign', name_token,
-                              name=name_token.value,
-                              value=value)
+        return AssignNode(self.values[name], value, self.lines[name], self.columns[name])
     
-    def parse_print(self) -> Dict[str, Any]:
+    def parse_print(self) -> Node:
         """Parse a print statement."""
-        print_token = self.consume('print', "Expected 'print'")
+        start = self.expect('print', "Expected 'print'")
         value = self.parse_expression()
         
-        if self.match(';'):
-            self.advance()
+        self.skip_semicolon()
         
-        return self.make_node('print', print_token, value=value)
+        return PrintNode(value, self.lines[start], self.columns[start])
     
-    def parse_if(self) -> Dict[str, Any]:
+    def parse_if(self) -> Node:
         """Parse an if statement."""
-        if_token = self.consume('if', "Expected 'if'")
-        self.consume('(', "Expected '(' after 'if'")
+        start = self.expect('if', "Expected 'if'")
+        self.expect('(', "Expected '(' after 'if'")
         condition = self.parse_expression()
-        self.consume(')', "Expected ')' after condition")
+        self.expect(')', "Expected ')' after condition")
         
         then_branch = self.parse_statement()
         else_branch = None
         
-        if self.match('else'):
-            self.advance()
+        if self.tags[self.pos] == 'else':
+            self.pos += 1
             else_branch = self.parse_statement()
         
         # Optional semicolon after if statement
-        if self.match(';'):
-            self.advance()
+        self.skip_semicolon()
         
-        return self.make_node('if', if_token,
-                              condition=condition,
-                              then=then_branch,
-                              else_=else_branch)
+        return IfNode(condition, then_branch, else_branch, self.lines[start], self.columns[start])
     
-    def parse_while(self) -> Dict[str, Any]:
+    def parse_while(self) -> Node:
         """Parse a while statement."""
-        while_token = self.consume('while', "Expected 'while'")
-        self.consume('(', "Expected '(' after 'while'")
+        start = self.expect('while', "Expected 'while'")
+        self.expect('(', "Expected '(' after 'while'")
         condition = self.parse_expression()
-        self.consume(')', "Expected ')' after condition")
+        self.expect(')', "Expected ')' after condition")
         
         body = self.parse_statement()
         
-        if self.match(';'):
-            self.advance()
+        self.skip_semicolon()
         
-        return self.make_node('while', while_token,
-                              condition=condition,
-                              body=body)
+        return WhileNode(condition, body, self.lines[start], self.columns[start])
     
-    def parse_block(self) -> Dict[str, Any]:
+    def parse_loop_jump(self) -> Node:
+        """Parse a break or continue statement."""
+        start = self.pos
+        self.pos += 1
+        self.skip_semicolon()
+        node_class = BreakNode if self.tags[start] == 'break' else ContinueNode
+        return node_class(self.lines[start], self.columns[start])
+    
+    def parse_block(self) -> Node:
         """Parse a block of statements."""
-        open_brace = self.consume('{', "Expected '{'")
+        start = self.expect('{', "Expected '{'")
         statements = []
+        tags = self.tags
+        block_end = self._BLOCK_END
         
-        while not self.match('}') and not self.match('EOF'):
+        while tags[self.pos] not in block_end:
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
         
-        self.consume('}', "Expected '}'")
+        self.expect('}', "Expected '}'")
         
-        return self.make_node('block', open_brace, statements=statements)
+        return BlockNode(statements, self.lines[start], self.columns[start])
     
-    def parse_expression_statement(self) -> Dict[str, Any]:
+    def parse_expression_statement(self) -> Node:
         """Parse an expression as a statement."""
         expr = self.parse_expression()
         
-        if self.match(';'):
-            self.advance()
+        self.skip_semicolon()
         
         return expr
     
-    def parse_expression(self) -> Dict[str, Any]:
+    def parse_expression(self) -> Node:
         """Parse an expression (entry point for expression parsing)."""
-        return self.parse_logical_or()
-    
-    def parse_logical_or(self) -> Dict[str, Any]:
-        """Parse logical OR expressions."""
-        left = self.parse_logical_and()
-        
-        while self.match('||'):
-            op_token = self.advance()
-            right = self.parse_logical_and()
-            left = self.make_node('binary', op_token,
-                                  op='||',
-                                  left=left,
-                                  right=right)
-        
-        return left
-    
-    def parse_logical_and(self) -> Dict[str, Any]:
-        """Parse logical AND expressions."""
-        left = self.parse_equality()
-        
-        while self.match('&&'):
-            op_token = self.advance()
-            right = self.parse_equality()
-            left = self.make_node('binary', op_token,
-                                  op='&&',
-                                  left=left,
-                                  right=right)
-        
-        return left
-    
-    def parse_equality(self) -> Dict[str, Any]:
-        """Parse equality expressions."""
-        left = self.parse_comparison()
-        
-        while self.match('==', '!='):
-            op_token = self.advance()
-            right = self.parse_comparison()
-            left = self.make_node('binary', op_token,
-                                  op=op_token.tag,
-                                  left=left,
-                                  right=right)
-        
-        return left
-    
-    def parse_comparison(self) -> Dict[str, Any]:
-        """Parse comparison expressions."""
-        left = self.parse_term()
-        
-        while self.match('<', '>', '<=', '>='):
-            op_token = self.advance()
-            right = self.parse_term()
-            left = self.make_node('binary', op_token,
-                                  op=op_token.tag,
-                                  left=left,
-                                  right=right)
-        
-        return left
-    
-    def parse_term(self) -> Dict[str, Any]:
-        """Parse addition/subtraction expressions."""
-        left = self.parse_factor()
-        
-        while self.match('+', '-'):
-            op_token = self.advance()
-            right = self.parse_factor()
-            left = self.make_node('binary', op_token,
-                                  op=op_token.tag,
-                                  left=left,
-                                  right=right)
-        
-        return left
+        return self.parse_expr(1)
     
-    def parse_factor(self) -> Dict[str, Any]:
-        """Parse multiplication/division expressions."""
+    def parse_expr(self, min_prec: int) -> Node:
+        """
+        Parse a binary expression whose operators bind at least as tightly
+        as min_prec (precedence climbing).
+        """
+        tags = self.tags
         left = self.parse_unary()
         
-        while self.match('*', '/', '%'):
-            op_token = self.advance()
-            right = self.parse_unary()
-            left = self.make_node('binary', op_token,
-                                  op=op_token.tag,
-                                  left=left,
-                                  right=right)
-        
-        return left
+        while True:
+            op_pos = self.pos
+            op = tags[op_pos]
+            prec = _PREC.get(op)
+            if prec is None or prec < min_prec:
+                return left
+            # An operator is never the last token (EOF is)
+            self.pos = op_pos + 1
+            # All binary operators are left-associative
+            right = self.parse_expr(prec + 1)
+            left = BinaryNode(op, left, right, self.lines[op_pos], self.columns[op_pos])
     
-    def parse_unary(self) -> Dict[str, Any]:
+    def parse_unary(self) -> Node:
         """Parse unary expressions."""
-        if self.match('!', '-'):
-            op_token = self.advance()
+        pos = self.pos
+        op = self.tags[pos]
+        if op in self._UNARY_OPS:
+            self.pos = pos + 1
             operand = self.parse_unary()
-            return self.make_node('unary', op_token,
-                                  op=op_token.tag,
-                                  operand=operand)
+            return UnaryNode(op, operand, self.lines[pos], self.columns[pos])
         
         return self.parse_primary()
     
-    def parse_primary(self) -> Dict[str, Any]:
+    def parse_primary(self) -> Node:
         """Parse primary expressions (literals, identifiers, parenthesized expressions)."""
-        token = self.current()
+        pos = self.pos
+        tag = self.tags[pos]
         
-        if self.match('number'):
-            self.advance()
-            # Handle both int and float
-            value = float(token.value) if '.' in token.value else int(token.value)
-            return self.make_node('number', token, value=value)
+        if tag == 'number':
+            self.pos = pos + 1
+            # The tokenizer has already converted the literal to int or float
+            return NumberNode(self.values[pos], self.lines[pos], self.columns[pos])
         
-        elif self.match('string'):
-            self.advance()
+        elif tag == 'string':
+            self.pos = pos + 1
             # Remove quotes and handle escape sequences
-            value = token.value[1:-1]  # Remove surrounding quotes
-            value = value.replace('\\n', '\n').replace('\\t', '\t').replace('\\"', '"').replace("\\'", "'")
-            return self.make_node('string', token, value=value)
+            value = self.values[pos][1:-1]  # Remove surrounding quotes
+            if '\\' in value:
+                value = _ESCAPE_RE.sub(_unescape, value)
+            return StringNode(value, self.lines[pos], self.columns[pos])
         
-        elif self.match('boolean'):
-            self.advance()
-            value = token.value == 'TRUE'
-            return self.make_node('boolean', token, value=value)
+        elif tag == 'boolean':
+            self.pos = pos + 1
+            return BooleanNode(self.values[pos] == 'TRUE', self.lines[pos], self.columns[pos])
         
-        elif self.match('identifier'):
-            self.advance()
-            return self.make_node('identifier', token, name=token.value)
+        elif tag == 'identifier':
+            self.pos = pos + 1
+            return IdentifierNode(self.values[pos], self.lines[pos], self.columns[pos])
         
-        elif self.match('('):
-            self.advance()
+        elif tag == '(':
+            self.pos = pos + 1
             expr = self.parse_expression()
-            self.consume(')', "Expected ')' after expression")
+            self.expect(')', "Expected ')' after expression")
             return expr
         
         else:
-            raise ParseError(f"Unexpected token: {token.tag}", token)
+            raise ParseError(f"Unexpected token: {tag}", self.tokens[pos])
+
+
+# Longest string the folder will build at parse time, so an expression in a
+# branch that never runs cannot make parsing slow. The length is worked out
+# from the operands (see _fits), before the operator runs.
+_MAX_FOLDED_LENGTH = 4096
+
+
+def _literal(value: Any, origin: Node) -> Optional[LiteralNode]:
+    """Make a literal node for a folded value, at origin's location."""
+    if isinstance(value, bool):
+        return BooleanNode(value, origin.line, origin.column)
+    if isinstance(value, (int, float)):
+        return NumberNode(value, origin.line, origin.column)
+    if isinstance(value, str):
+        return StringNode(value, origin.line, origin.column)
+    return None
+
+
+def _fits(op_id: int, left: Any, right: Any) -> bool:
+    """Whether left <op> right is short enough to fold, without computing it."""
+    if op_id == BINOP_ADD:
+        if isinstance(left, str) or isinstance(right, str):
+            return len(str(left)) + len(str(right)) <= _MAX_FOLDED_LENGTH
+    elif op_id == BINOP_MUL:
+        if isinstance(left, str) and isinstance(right, int):
+            return len(left) * right <= _MAX_FOLDED_LENGTH
+        if isinstance(right, str) and isinstance(left, int):
+            return len(right) * left <= _MAX_FOLDED_LENGTH
+    elif op_id == BINOP_MOD:
+        # String formatting: a field width can make the result any length
+        return not isinstance(left, str)
+    return True
+
+
+def _fold_binary(node: BinaryNode) -> Node:
+    left, right = node.left, node.right
+    if not (isinstance(left, LiteralNode) and isinstance(right, LiteralNode)):
+        return node
+    op = node.op
+    op_id = BINARY_OP_IDS.get(op)
+    if op_id is None:
+        if op == '&&':
+            return left if not is_truthy(left.value) else right
+        if op == '||':
+            return left if is_truthy(left.value) else right
+        return node
+    if not _fits(op_id, left.value, right.value):
+        return node
+    try:
+        value = BINOP_TABLE[op_id](left.value, right.value)
+    except Exception:
+        # Leave the error to be reported when (and if) the code runs
+        return node
+    return _literal(value, left) or node
+
+
+def _fold_unary(node: UnaryNode) -> Node:
+    operand = node.operand
+    func = UNARY_OPERATORS.get(node.op)
+    if func is None or not isinstance(operand, LiteralNode):
+        return node
+    try:
+        value = func(operand.value)
+    except Exception:
+        return node
+    return _literal(value, node) or node
+
+
+def fold(node: Optional[Node]) -> Optional[Node]:
+    """
+    Fold constant sub-expressions into literals.
+    
+    Operators whose operands are all literals are computed with the shared
+    operator table (see operators.py), so ``2 + 3 * 4`` becomes the literal
+    14. Operations that would fail, such as ``1 / 0``, are kept so the error
+    is still raised at run time. Containers are updated in place; the
+    (possibly replaced) node is returned.
+    """
+    kind = type(node)
+    if kind is BinaryNode:
+        node.left = fold(node.left)
+        node.right = fold(node.right)
+        return _fold_binary(node)
+    elif kind is UnaryNode:
+        node.operand = fold(node.operand)
+        return _fold_unary(node)
+    elif kind is ProgramNode or kind is BlockNode:
+        node.statements = [fold(stmt) for stmt in node.statements]
+    elif kind is AssignNode or kind is PrintNode:
+        node.value = fold(node.value)
+    elif kind is IfNode:
+        node.condition = fold(node.condition)
+        node.then = fold(node.then)
+        node.else_ = fold(node.else_)
+    elif kind is WhileNode:
+        node.condition = fold(node.condition)
+        node.body = fold(node.body)
+    return node
 
 
-def parse(source_or_tokens) -> Dict[str, Any]:
+def parse(source_or_tokens) -> Node:
     """
     Parse source code or tokens into an AST.
     
     Args:
-        source_or_tokens: Either a source string or a list of tokens
+        source_or_tokens: A source string, a TokenStream or a list of tokens
         
     Returns:
-        AST dictionary
+        The program node
     """
     if isinstance(source_or_tokens, str):
         tokens = tokenize(source_or_tokens)
@@ -378,7 +631,7 @@ def test_parse_assignment():
 
 
 def test_parse_binary():
-    ast = parse("2 + 3 * 4")
+    ast = parse("2 + x * 4")
     stmt = ast['statements'][0]
     assert stmt['tag'] == 'binary'
     assert stmt['op'] == '+'
@@ -412,6 +665,64 @@ def test_location_info():
     print("✓ test_location_info passed")
 
 
+def test_slotted_nodes():
+    ast = parse("x = -y")
+    stmt = ast.statements[0]
+    assert isinstance(stmt, AssignNode)
+    assert isinstance(stmt.value, UnaryNode)
+    assert stmt.value.operand.name == 'y'
+    # Nodes have a fixed layout (no per-instance dict)
+    assert not hasattr(stmt, '__dict__')
+    assert stmt.get('missing') is None
+    print("✓ test_slotted_nodes passed")
+
+
+def test_constant_folding():
+    stmts = parse("2 + 3 * 4; -(1 + 1); !0; 'a' + 1; 1 < 2 && 0; x = 1 / 0").statements
+    assert type(stmts[0]) is NumberNode and stmts[0].value == 14
+    assert stmts[0].column == 1
+    assert stmts[1].value == -2
+    assert type(stmts[2]) is BooleanNode and stmts[2].value is True
+    assert type(stmts[3]) is StringNode and stmts[3].value == 'a1'
+    assert stmts[4].value == 0
+    # Division by zero is left for the evaluator to report
+    assert type(stmts[5].value) is BinaryNode
+    # Results over the length limit are left unfolded, and never built
+    stmts = parse("if (0) { y = 'a' * 1000000000; z = 10000000000 * 'ab' + 'c' }; "
+                  "'%999999999d' % 1; 'ab' * 3").statements
+    block = stmts[0].then.statements
+    assert type(block[0].value) is BinaryNode and type(block[1].value.left) is BinaryNode
+    assert type(stmts[1]) is BinaryNode
+    assert stmts[2].value == 'ababab'
+    print("✓ test_constant_folding passed")
+
+
+def test_string_escapes():
+    stmts = parse(r"""'a\tb\n'; "say \"hi\""; 'it\'s'; 'c:\\n'; 'plain'""").statements
+    assert [s.value for s in stmts] == ['a\tb\n', 'say "hi"', "it's", 'c:\\\n', 'plain']
+    print("✓ test_string_escapes passed")
+
+
+def test_precedence():
+    # Each right operand holds the next tighter precedence level
+    expr = parse("a || b && c == d < e + f * -g - h").statements[0]
+    ops = []
+    while isinstance(expr, BinaryNode):
+        ops.append(expr.op)
+        expr = expr.right
+    assert ops == ['||', '&&', '==', '<', '-']
+    # Left associativity
+    expr = parse("a - b - c").statements[0]
+    assert expr.left.op == '-' and expr.right.name == 'c'
+    print("✓ test_precedence passed")
+
+
+def test_parse_break_continue():
+    loop = parse("while (TRUE) { continue; break }").statements[0]
+    assert [type(s) for s in loop.body.statements] == [ContinueNode, BreakNode]
+    print("✓ test_parse_break_continue passed")
+
+
 if __name__ == "__main__":
     test_parse_number()
     test_parse_assignment()
@@ -419,4 +730,9 @@ if __name__ == "__main__":
     test_parse_if()
     test_parse_while()
     test_location_info()
+    test_slotted_nodes()
+    test_constant_folding()
+    test_string_escapes()
+    test_precedence()
+    test_parse_break_continue()
     print("\nAll parser tests passed!")
@@ -0,0 +1,133 @@
+"""
+resolver.py - Variable Resolver
+
+Runs between the parser and the compiler and resolves every variable
+reference to an integer slot, so the evaluator indexes a list instead of
+probing a dict by name on every access.
+
+Assignments always bind in the top-level scope: Environment.assign searches
+up to the root environment and creates missing variables there. Blocks
+therefore never own variables, and a single flat frame of slots is enough.
+Identifier and assign nodes get ``slot``; the program node gets ``names``,
+the top-level names in slot order.
+"""
+
+from typing import List, Dict, Optional, Iterable
+
+from parser import (
+    Node, ProgramNode, BlockNode, AssignNode, PrintNode, IfNode, WhileNode,
+    BinaryNode, UnaryNode, IdentifierNode,
+)
+
+
+class _Unset:
+    """Type of UNSET, the value of a slot whose variable was never assigned."""
+    def __repr__(self):
+        return 'UNSET'
+
+
+UNSET = _Unset()
+
+
+class Resolver:
+    """
+    Annotates an AST with variable slots.
+
+    The slot table can be seeded with the names of an existing environment
+    (e.g. the REPL's), so new programs see the variables of earlier ones.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = list(names)
+        self.slots: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def slot(self, name: str) -> int:
+        """Get the slot for a name, allocating the next free one if needed."""
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.names.append(name)
+            self.slots[name] = slot
+        return slot
+
+    def resolve(self, node: Node) -> Node:
+        """Resolve a program (or a single statement) in place and return it."""
+        self.resolve_node(node)
+        if isinstance(node, ProgramNode):
+            node.names = tuple(self.names)
+        return node
+
+    def resolve_node(self, node: Optional[Node]):
+        # Visit children in source order so slots follow first appearance
+        kind = type(node)
+        if kind is IdentifierNode:
+            node.slot = self.slot(node.name)
+        elif kind is AssignNode:
+            node.slot = self.slot(node.name)
+            self.resolve_node(node.value)
+        elif kind is ProgramNode or kind is BlockNode:
+            for stmt in node.statements:
+                self.resolve_node(stmt)
+        elif kind is PrintNode:
+            self.resolve_node(node.value)
+        elif kind is IfNode:
+            self.resolve_node(node.condition)
+            self.resolve_node(node.then)
+            self.resolve_node(node.else_)
+        elif kind is WhileNode:
+            self.resolve_node(node.condition)
+            self.resolve_node(node.body)
+        elif kind is BinaryNode:
+            self.resolve_node(node.left)
+            self.resolve_node(node.right)
+        elif kind is UnaryNode:
+            self.resolve_node(node.operand)
+
+
+def resolve(ast: Node, names: Iterable[str] = ()) -> Node:
+    """
+    Resolve variable slots in an AST.
+
+    Args:
+        ast: The AST to annotate in place
+        names: Names already holding slots in the target environment, in slot order
+
+    Returns:
+        The annotated AST
+    """
+    return Resolver(names).resolve(ast)
+
+
+# Test functions
+def test_resolve_slots():
+    from parser import parse
+    ast = resolve(parse("x = 1; y = 2; x = y"))
+    assert ast.names == ('x', 'y')
+    assign = ast.statements[2]
+    assert assign.slot == 0
+    assert assign.value.slot == 1
+    print("✓ test_resolve_slots passed")
+
+
+def test_resolve_blocks():
+    from parser import parse
+    # Variables first assigned inside a block still live in the top-level frame
+    ast = resolve(parse("while (x < 5) { y = x + 1 }; y"))
+    assert ast.names == ('x', 'y')
+    assert ast.statements[1].slot == 1
+    print("✓ test_resolve_blocks passed")
+
+
+def test_resolve_seeded():
+    from parser import parse
+    ast = resolve(parse("y = x"), names=['x'])
+    assert ast.names == ('x', 'y')
+    assert ast.statements[0].value.slot == 0
+    print("✓ test_resolve_seeded passed")
+
+
+if __name__ == "__main__":
+    test_resolve_slots()
+    test_resolve_blocks()
+    test_resolve_seeded()
+    print("\nAll resolver tests passed!")
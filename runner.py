@@ -5,6 +5,7 @@ runner.py - Language Interpreter Runner with Variable Watch Support
 Usage:
     python runner.py <source_file>                  # Run a source file
     python runner.py <source_file> watch=<var>      # Run with variable watching
+    python runner.py <source_file> --cache          # Reuse parsed programs (AST cache)
     python runner.py --help                         # Show help
 
 Examples:
@@ -26,7 +27,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from tokenizer import tokenize, TokenizerError
 from parser import parse, ParseError
-from evaluator import evaluate, Environment, Evaluator, RuntimeError as EvalRuntimeError
+from compiler import CompileError
+from evaluator import evaluate, Environment, Evaluator, EvalError
+import ast_cache
 
 
 # ANSI color codes for terminal output
@@ -42,62 +45,101 @@ class Colors:
     RESET = '\033[0m'
 
 
+# The stdout stream last checked by _stdout_is_tty(), and whether it is a terminal
+_tty_stream = None
+_tty = False
+
+
+def _stdout_is_tty() -> bool:
+    """Whether stdout is a terminal, checked once per stdout stream."""
+    global _tty_stream, _tty
+    stream = sys.stdout
+    if stream is not _tty_stream:
+        _tty_stream = stream
+        _tty = stream.isatty()
+    return _tty
+
+
 def colorize(text: str, color: str) -> str:
     """Apply color to text if stdout is a terminal."""
-    if sys.stdout.isatty():
+    if _stdout_is_tty():
         return f"{color}{text}{Colors.RESET}"
     return text
 
 
+# How the watch notification shows a value, by its type; numbers use str()
+WATCH_FORMATS = {
+    str: lambda value: f'"{value}"',
+    bool: lambda value: "TRUE" if value else "FALSE",
+}
+
+
 def create_watch_callback(variable_name: str):
     """
     Create a callback function for watching variable changes.
     
     Returns a function that prints watch notifications when called.
     """
+    # Notifications are written to sys.stdout from one prebuilt template,
+    # without print()'s per-call overhead, in order with the program's own
+    # print output; a watched loop variable can produce one per iteration.
+    template = colorize("[WATCH] %s = %s at line %s, column %s", Colors.YELLOW) + "\n"
+    formats = WATCH_FORMATS
+    
     def watch_callback(name: str, value: any, line: int, column: int):
         # Format the value nicely
-        if isinstance(value, str):
-            value_str = f'"{value}"'
-        elif isinstance(value, bool):
-            value_str = "TRUE" if value else "FALSE"
-        else:
-            value_str = str(value)
+        value_str = formats.get(type(value), str)(value)
         
         # Print the watch notification
-        watch_msg = f"[WATCH] {name} = {value_str} at line {line}, column {column}"
-        print(colorize(watch_msg, Colors.YELLOW))
+        # stdout is looked up per call, so redirecting it later still applies
+        sys.stdout.write(template % (name, value_str, line, column))
     
     return watch_callback
 
 
-def run_file(filepath: str, watch_variable: Optional[str] = None) -> bool:
+def read_source(filepath: str) -> str:
+    """
+    Read a UTF-8 source file, with newlines translated to '\n' as in text mode.
+
+    The file is read unbuffered in one call and decoded in one pass, rather
+    than through a text-mode file's buffer and incremental decoder.
+    """
+    with open(filepath, 'rb', buffering=0) as f:
+        source = f.read().decode('utf-8')
+    if '\r' in source:
+        source = source.replace('\r\n', '\n').replace('\r', '\n')
+    return source
+
+
+def run_file(filepath: str, watch_variable: Optional[str] = None,
+             use_cache: bool = False) -> bool:
     """
     Run a source file through the interpreter.
     
     Args:
         filepath: Path to the source file
         watch_variable: Optional variable name to watch for changes
+        use_cache: Whether to reuse and save the parsed program (see ast_cache.py)
         
     Returns:
         True if execution succeeded, False otherwise
     """
     # Read the source file
     try:
-        with open(filepath, 'r') as f:
-            source = f.read()
+        source = read_source(filepath)
     except FileNotFoundError:
         print(colorize(f"Error: File not found: {filepath}", Colors.RED))
         return False
-    except IOError as e:
+    except (IOError, UnicodeDecodeError) as e:
         print(colorize(f"Error reading file: {e}", Colors.RED))
         return False
     
-    return run_source(source, filepath, watch_variable)
+    return run_source(source, filepath, watch_variable, use_cache)
 
 
 def run_source(source: str, filename: str = "<stdin>", 
-               watch_variable: Optional[str] = None) -> bool:
+               watch_variable: Optional[str] = None,
+               use_cache: bool = False) -> bool:
     """
     Run source code through the interpreter.
     
@@ -105,6 +147,7 @@ def run_source(source: str, filename: str = "<stdin>",
         source: The source code string
         filename: Name of the source file (for error messages)
         watch_variable: Optional variable name to watch for changes
+        use_cache: Whether to reuse and save the parsed program (see ast_cache.py)
         
     Returns:
         True if execution succeeded, False otherwise
@@ -114,11 +157,15 @@ def run_source(source: str, filename: str = "<stdin>",
         print()
     
     try:
-        # Tokenize
-        tokens = tokenize(source)
-        
-        # Parse
-        ast = parse(tokens)
+        ast = ast_cache.load(source) if use_cache else None
+        if ast is None:
+            # Tokenize
+            tokens = tokenize(source)
+            
+            # Parse
+            ast = parse(tokens)
+            if use_cache:
+                ast_cache.store(source, ast)
         
         # Set up environment with watch callback
         env = Environment()
@@ -144,7 +191,12 @@ def run_source(source: str, filename: str = "<stdin>",
         print(colorize(f"  {e}", Colors.RED))
         return False
         
-    except EvalRuntimeError as e:
+    except CompileError as e:
+        print(colorize(f"Compile Error in {filename}:", Colors.RED))
+        print(colorize(f"  {e}", Colors.RED))
+        return False
+        
+    except EvalError as e:
         print(colorize(f"Runtime Error in {filename}:", Colors.RED))
         print(colorize(f"  {e}", Colors.RED))
         return False
@@ -192,6 +244,8 @@ location where the change occurred.
     parser.add_argument('extras', nargs='*', help='Additional arguments (e.g., watch=<var>)')
     parser.add_argument('--watch', '-w', dest='watch', 
                         help='Variable name to watch for changes')
+    parser.add_argument('--cache', dest='use_cache', action='store_true',
+                        help='Reuse and save parsed programs in the on-disk AST cache')
     parser.add_argument('--version', '-v', action='version', 
                         version='Language Tools Runner v1.0')
     
@@ -213,7 +267,7 @@ location where the change occurred.
             break
     
     # Run the file
-    success = run_file(args.file, watch_variable)
+    success = run_file(args.file, watch_variable, args.use_cache)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
@@ -229,18 +283,24 @@ def run_interactive():
     evaluator = Evaluator(env)
     watch_variable = None
     
+    # Everything the tokenizer and parser precompute is built at import;
+    # running them once here also loads the compiled tokenizer kernel (when
+    # Numba is available) before the first line is typed.
+    parse(tokenize("x = 0"))
+    
     while True:
         try:
             # Read input
             prompt = colorize(">>> ", Colors.GREEN)
             line = input(prompt)
+            command = line.strip().lower()
             
             # Handle special commands
-            if line.strip().lower() in ('exit', 'quit'):
+            if command in ('exit', 'quit'):
                 print("Goodbye!")
                 break
             
-            if line.strip().lower() == 'help':
+            if command == 'help':
                 print("Commands:")
                 print("  exit, quit     - Exit the interpreter")
                 print("  help           - Show this help")
@@ -249,27 +309,27 @@ def run_interactive():
                 print("  env            - Show current environment")
                 continue
             
-            if line.strip().lower().startswith('watch '):
+            if command.startswith('watch '):
                 var_name = line.strip()[6:].strip()
                 watch_variable = var_name
                 env.set_watch(var_name, create_watch_callback(var_name))
                 print(colorize(f"Now watching: {var_name}", Colors.CYAN))
                 continue
             
-            if line.strip().lower() == 'unwatch':
+            if command == 'unwatch':
                 watch_variable = None
                 env.watched_variable = None
                 env.watch_callback = None
                 print(colorize("Stopped watching variables", Colors.CYAN))
                 continue
             
-            if line.strip().lower() == 'env':
+            if command == 'env':
                 print("Current variables:")
                 for name, value in env.variables.items():
                     print(f"  {name} = {value}")
                 continue
             
-            if not line.strip():
+            if not command:
                 continue
             
             # Parse and evaluate
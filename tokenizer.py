@@ -2,89 +2,187 @@
 tokenizer.py - Lexical Analyzer with Location Tracking
 
 Converts source code into a stream of tokens, each with line/column information.
+
+The stream is stored structure-of-arrays (see TokenStream): one list of tags,
+one of values, and compact integer arrays of lines and columns, instead of
+one object per token. Indexing the stream still gives Token objects.
+
+If numba and numpy are installed, scanning runs in a compiled kernel over the
+source's code points (see _scan), and the regular expression scanner is only
+used for sources the kernel hands back (errors, non-ASCII outside strings and
+comments). Both give the same tokens.
+
+The module is also valid Cython in pure Python mode: `cythonize -i
+tokenizer.py` builds an extension that Python imports in place of this file,
+with the scanning loop's counters as C integers.
 """
 
 import re
-from dataclasses import dataclass
-from typing import List, Optional
+import sys
+from array import array
+from typing import List, Iterable, Iterator, Optional, Union
+
+try:
+    import numba
+    import numpy as np
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    np = None
+    NUMBA_AVAILABLE = False
+
+# True when this module has been compiled by Cython
+try:
+    import cython
+    COMPILED = bool(cython.compiled)
+except ImportError:
+    COMPILED = False
+
 
-@dataclass
 class Token:
     """A token with its value, type, and source location."""
-    tag: str           # Token type (e.g., 'number', 'identifier', '+')
-    value: str         # The actual text
-    line: int          # Line number (1-indexed)
-    column: int        # Column number (1-indexed)
+    # Slotted, since a program has one per token: no per-instance __dict__
+    __slots__ = ('tag', 'value', 'line', 'column')
+    
+    def __init__(self, tag: str, value: Union[str, int, float], line: int, column: int):
+        self.tag = tag        # Token type (e.g., 'number', 'identifier', '+')
+        self.value = value    # The actual text (the int/float value for numbers)
+        self.line = line      # Line number (1-indexed)
+        self.column = column  # Column number (1-indexed)
+    
+    def __eq__(self, other):
+        if type(other) is not Token:
+            return NotImplemented
+        return (self.tag == other.tag and self.value == other.value
+                and self.line == other.line and self.column == other.column)
+    
+    __hash__ = None  # Mutable and compared by value
     
     def __repr__(self):
         return f"Token({self.tag!r}, {self.value!r}, line={self.line}, col={self.column})"
 
 
-# Token patterns - order matters! More specific patterns first.
+class TokenStream:
+    """
+    A token sequence stored as parallel arrays.
+
+    ``tags[i]``, ``values[i]``, ``lines[i]`` and ``columns[i]`` describe token
+    i. The parser reads the arrays directly; ``stream[i]`` builds a Token for
+    code that wants one, and slicing or iterating gives Tokens as well.
+    """
+    __slots__ = ('tags', 'values', 'lines', 'columns')
+    
+    def __init__(self):
+        self.tags: List[str] = []
+        self.values: List[Union[str, int, float]] = []
+        self.lines = array('I')
+        self.columns = array('I')
+    
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token]) -> 'TokenStream':
+        stream = cls()
+        for token in tokens:
+            stream.append(token.tag, token.value, token.line, token.column)
+        return stream
+    
+    def append(self, tag: str, value: Union[str, int, float], line: int, column: int):
+        self.tags.append(tag)
+        self.values.append(value)
+        self.lines.append(line)
+        self.columns.append(column)
+    
+    def __len__(self) -> int:
+        return len(self.tags)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.tags)))]
+        return Token(self.tags[index], self.values[index],
+                     self.lines[index], self.columns[index])
+    
+    def __iter__(self) -> Iterator[Token]:
+        return map(Token, self.tags, self.values, self.lines, self.columns)
+    
+    def __repr__(self):
+        return f"TokenStream({list(self)!r})"
+
+
+# Keywords, by text. Words are scanned by a single pattern and looked up
+# here; anything else is an identifier.
+KEYWORDS = {
+    'TRUE': 'boolean',
+    'FALSE': 'boolean',
+    'print': 'print',
+    'if': 'if',
+    'else': 'else',
+    'while': 'while',
+    'for': 'for',
+    'break': 'break',
+    'continue': 'continue',
+    'return': 'return',
+    'function': 'function',
+    'and': '&&',
+    'or': '||',
+    'not': '!',
+}
+
+# Operators and punctuation; each one's tag is its own text. Two-character
+# operators come first so they win over their one-character prefixes.
+OPERATORS = (
+    '==', '!=', '<=', '>=', '&&', '||',
+    '+', '-', '*', '/', '%', '<', '>', '=', '!',
+    '(', ')', '{', '}', '[', ']', ';', ',', '.',
+)
+
+# Whitespace and newlines between tokens, skipped as part of each match.
+# Comments are matched as tokens of their own instead (see PATTERNS) and
+# dropped by the scanner: a comment swallowed by this prefix could be given
+# back by backtracking and read as a division operator when no token follows.
+SKIP_PATTERN = r'[ \t\n]*'
+
+# Token patterns - order matters! A word must be tried before the glued
+# identifier, and a number and a comment before the operators ('.5' is a
+# number, not '.', and '//' a comment, not two divisions). Otherwise
+# patterns come in order of how often they match (words, then operators,
+# numbers and strings in typical programs), so most tokens fail as few
+# alternatives as possible.
 PATTERNS = [
-    # Comments (must come before division operator)
-    (r'//[^\n]*', 'comment'),
-    (r'#[^\n]*', 'comment'),
-    
-    # Keywords (must come before identifier)
-    (r'\bTRUE\b', 'boolean'),
-    (r'\bFALSE\b', 'boolean'),
-    (r'\bprint\b', 'print'),
-    (r'\bif\b', 'if'),
-    (r'\belse\b', 'else'),
-    (r'\bwhile\b', 'while'),
-    (r'\bfor\b', 'for'),
-    (r'\bbreak\b', 'break'),
-    (r'\bcontinue\b', 'continue'),
-    (r'\breturn\b', 'return'),
-    (r'\bfunction\b', 'function'),
-    (r'\band\b', '&&'),
-    (r'\bor\b', '||'),
-    (r'\bnot\b', '!'),
-    
-    # Literals
-    (r'\d+\.\d*|\.\d+|\d+', 'number'),      # Numbers (int and float)
-    (r'"([^"\\]|\\.)*"', 'string'),          # Double-quoted strings
-    (r"'([^'\\]|\\.)*'", 'string'),          # Single-quoted strings
-    
-    # Identifiers
-    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'identifier'),
+    # Words: keywords and identifiers (see KEYWORDS). A word is only a
+    # keyword between word boundaries; followed by a non-ASCII word
+    # character (e.g. 'TRUE\u0663') it falls through to the identifier pattern.
+    (r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', 'word'),
+    
+    # Literals. The number pattern reads its digits once.
+    (r'\d+(?:\.\d*)?|\.\d+', 'number'),    # Numbers (int and float)
     
-    # Multi-character operators (must come before single-char)
-    (r'==', '=='),
-    (r'!=', '!='),
-    (r'<=', '<='),
-    (r'>=', '>='),
-    (r'&&', '&&'),
-    (r'\|\|', '||'),
-    
-    # Single-character operators and punctuation
-    (r'\+', '+'),
-    (r'-', '-'),
-    (r'\*', '*'),
-    (r'/', '/'),
-    (r'%', '%'),
-    (r'<', '<'),
-    (r'>', '>'),
-    (r'=', '='),
-    (r'!', '!'),
-    (r'\(', '('),
-    (r'\)', ')'),
-    (r'\{', '{'),
-    (r'\}', '}'),
-    (r'\[', '['),
-    (r'\]', ']'),
-    (r';', ';'),
-    (r',', ','),
-    (r'\.', '.'),
-    
-    # Whitespace (will be skipped)
-    (r'[ \t]+', 'whitespace'),
-    (r'\n', 'newline'),
+    # Comments; tag None, never turned into tokens
+    (r'//[^\n]*|#[^\n]*', None),
+    
+    # Operators and punctuation (see OPERATORS)
+    ('|'.join(re.escape(op) for op in OPERATORS), 'operator'),
+    
+    (r'"(?:[^"\\]|\\.)*"', 'string'),        # Double-quoted strings
+    (r"'(?:[^'\\]|\\.)*'", 'string'),        # Single-quoted strings
+    
+    # A word right after a number (e.g. '5if') is never a keyword
+    (r'[a-zA-Z_][a-zA-Z0-9_]*', 'identifier'),
 ]
 
-# Compile all patterns
-COMPILED_PATTERNS = [(re.compile(pattern), tag) for pattern, tag in PATTERNS]
+# Skipped text, then one token: all patterns as one alternation, each in its
+# own group. Alternatives are tried in order, so the first pattern that
+# matches wins, as in PATTERNS; match.lastindex is the 1-based position of
+# that pattern.
+MASTER_PATTERN = re.compile(SKIP_PATTERN + '(?:' +
+                            '|'.join(f'({pattern})' for pattern, tag in PATTERNS) + ')')
+SKIP_RE = re.compile(SKIP_PATTERN)
+GROUP_TAGS = [None] + [tag for pattern, tag in PATTERNS]
+
+# One shared string object for each keyword and operator, so repeated tokens
+# do not each hold their own copy of the text
+INTERNED = {text: sys.intern(text) for text in (*KEYWORDS, *OPERATORS)}
+
+# A keyword's tag and shared text, so a word needs one lookup
+KEYWORD_TOKENS = {text: (tag, INTERNED[text]) for text, tag in KEYWORDS.items()}
 
 
 class TokenizerError(Exception):
@@ -95,56 +193,290 @@ class TokenizerError(Exception):
         super().__init__(f"Tokenizer error at line {line}, column {column}: {message}")
 
 
-def tokenize(source: str) -> List[Token]:
+def _njit(func):
+    """Compile with Numba when available, otherwise run as plain Python."""
+    # Numba can only compile Python functions, not Cython's
+    if numba is None or COMPILED:
+        return func
+    return numba.njit(cache=True, boundscheck=False)(func)
+
+
+# Token kinds reported by the scan kernel
+K_WORD = 0
+K_IDENTIFIER = 1
+K_NUMBER = 2
+K_STRING = 3
+K_OPERATOR = 4
+
+# Kernel exit status
+SCAN_OK = 0
+SCAN_BAIL = 1
+
+
+def _char_table(chars: str):
+    """Flags for the ASCII code points, set for each of chars."""
+    flags = [0] * 128
+    for char in chars:
+        flags[ord(char)] = 1
+    if np is None:
+        return flags
+    return np.array(flags, dtype=np.uint8)
+
+
+# [a-zA-Z0-9_], and the one-character operators
+WORD_CHARS = _char_table('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+OPERATOR_CHARS = _char_table(''.join(op for op in OPERATORS if len(op) == 1))
+
+
+@_njit
+def _scan(buf, word_chars, operator_chars, kinds, starts, ends, lines, columns):
     """
-    Tokenize the source code into a list of tokens.
+    Scan the code points in buf, mirroring MASTER_PATTERN.
+
+    Token i is kinds[i] (a K_* kind) spanning buf[starts[i]:ends[i]], at
+    lines[i]/columns[i].
+
+    Returns:
+        (status, token count, line and line start offset at the end). The
+        status is SCAN_BAIL for anything the regex scanner must decide: an
+        error, or a non-ASCII character outside strings and comments.
+    """
+    n = len(buf)
+    pos = 0
+    line = 1
+    line_start = 0
+    count = 0
+    while True:
+        # Whitespace, newlines and comments
+        while pos < n:
+            c = buf[pos]
+            if c == 10:
+                pos += 1
+                line += 1
+                line_start = pos
+            elif c == 32 or c == 9:
+                pos += 1
+            elif c == 35 or (c == 47 and pos + 1 < n and buf[pos + 1] == 47):
+                while pos < n and buf[pos] != 10:
+                    pos += 1
+            else:
+                break
+        if pos >= n:
+            return SCAN_OK, count, line, line_start
+        
+        start = pos
+        token_line = line
+        token_line_start = line_start
+        c = buf[pos]
+        if c >= 128:
+            return SCAN_BAIL, count, line, line_start
+        if word_chars[c] and not 48 <= c <= 57:
+            pos += 1
+            while pos < n and buf[pos] < 128 and word_chars[buf[pos]]:
+                pos += 1
+            # A word glued to the end of a number is never a keyword
+            kind = K_WORD
+            if start > 0 and buf[start - 1] < 128 and word_chars[buf[start - 1]]:
+                kind = K_IDENTIFIER
+        elif 48 <= c <= 57 or (c == 46 and pos + 1 < n and 48 <= buf[pos + 1] <= 57):
+            kind = K_NUMBER
+            while pos < n and 48 <= buf[pos] <= 57:
+                pos += 1
+            if pos < n and buf[pos] == 46:
+                pos += 1
+                while pos < n and 48 <= buf[pos] <= 57:
+                    pos += 1
+        elif c == 34 or c == 39:
+            kind = K_STRING
+            pos += 1
+            while True:
+                if pos >= n:
+                    return SCAN_BAIL, count, line, line_start
+                d = buf[pos]
+                if d == c:
+                    pos += 1
+                    break
+                if d == 92:
+                    # '\\.' - any character but a newline may be escaped
+                    if pos + 1 >= n or buf[pos + 1] == 10:
+                        return SCAN_BAIL, count, line, line_start
+                    pos += 2
+                    continue
+                pos += 1
+                if d == 10:
+                    line += 1
+                    line_start = pos
+        else:
+            kind = K_OPERATOR
+            d = buf[pos + 1] if pos + 1 < n else 0
+            if (d == 61 and (c == 61 or c == 33 or c == 60 or c == 62)) or \
+                    (d == c and (c == 38 or c == 124)):
+                pos += 2
+            elif operator_chars[c]:
+                pos += 1
+            else:
+                return SCAN_BAIL, count, line, line_start
+        
+        kinds[count] = kind
+        starts[count] = start
+        ends[count] = pos
+        lines[count] = token_line
+        columns[count] = start - token_line_start + 1
+        count += 1
+
+
+def tokenize(source: str) -> TokenStream:
+    """
+    Tokenize the source code into a stream of tokens.
     
     Args:
         source: The source code string
         
     Returns:
-        List of Token objects
+        TokenStream of the tokens, ending with an EOF token
         
     Raises:
         TokenizerError: If an unexpected character is encountered
     """
-    tokens = []
-    pos = 0
-    line = 1
-    column = 1
+    if NUMBA_AVAILABLE and not COMPILED:
+        tokens = _tokenize_compiled(source)
+        if tokens is not None:
+            return tokens
+    return _tokenize_regex(source)
+
+
+def _tokenize_compiled(source: str) -> Optional[TokenStream]:
+    """Tokenize with the _scan kernel; None if it bails."""
+    size = len(source) + 1
+    if np is None:
+        buf = [ord(char) for char in source]
+        kinds, starts, ends, lines, columns = ([0] * size for _ in range(5))
+    else:
+        buf = np.frombuffer(source.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        kinds, starts, ends, lines, columns = (np.zeros(size, dtype=np.int64) for _ in range(5))
+    status, count, line, line_start = _scan(buf, WORD_CHARS, OPERATOR_CHARS,
+                                            kinds, starts, ends, lines, columns)
+    if status != SCAN_OK:
+        return None
+    if np is not None:
+        kinds, starts, ends, lines, columns = (
+            a[:count].tolist() for a in (kinds, starts, ends, lines, columns))
     
-    while pos < len(source):
-        match = None
-        
-        for pattern, tag in COMPILED_PATTERNS:
-            match = pattern.match(source, pos)
-            if match:
-                value = match.group(0)
-                
-                # Skip whitespace, newlines, and comments but track position
-                if tag == 'newline':
-                    line += 1
-                    column = 1
-                elif tag in ('whitespace', 'comment'):
-                    column += len(value)
-                else:
-                    # Create token with current position
-                    tokens.append(Token(tag, value, line, column))
-                    column += len(value)
-                
-                pos = match.end()
-                break
+    tokens = TokenStream()
+    add_tag = tokens.tags.append
+    add_value = tokens.values.append
+    keywords = KEYWORD_TOKENS
+    interned = INTERNED
+    intern = sys.intern
+    for i in range(count):
+        kind = kinds[i]
+        value = source[starts[i]:ends[i]]
+        if kind == K_WORD:
+            keyword = keywords.get(value)
+            if keyword is None:
+                tag = 'identifier'
+                value = intern(value)
+            else:
+                tag, value = keyword
+        elif kind == K_OPERATOR:
+            tag = value = interned[value]
+        elif kind == K_IDENTIFIER:
+            tag = 'identifier'
+            value = intern(value)
+        elif kind == K_NUMBER:
+            tag = 'number'
+            value = float(value) if '.' in value else int(value)
+        else:
+            tag = 'string'
+        add_tag(tag)
+        add_value(value)
+    tokens.lines.extend(lines[:count])
+    tokens.columns.extend(columns[:count])
+    tokens.append('EOF', '', line, len(source) - line_start + 1)
+    return tokens
+
+
+def _tokenize_regex(source: str) -> TokenStream:
+    """Tokenize with MASTER_PATTERN; see tokenize()."""
+    tokens = TokenStream()
+    add_tag = tokens.tags.append
+    add_value = tokens.values.append
+    add_line = tokens.lines.append
+    add_column = tokens.columns.append
+    # Local annotations are never evaluated; Cython reads them as C types
+    pos: cython.Py_ssize_t = 0
+    start: cython.Py_ssize_t
+    keywords = KEYWORD_TOKENS
+    interned = INTERNED
+    intern = sys.intern
+    match_token = MASTER_PATTERN.match
+    group_tags = GROUP_TAGS
+    find = source.find
+    
+    # Locations come from the newline offsets: line_start is the offset of
+    # the current line, and next_newline the offset of the newline ending
+    # it. Tokens arrive in order, so the line only ever moves forward.
+    end: cython.Py_ssize_t = len(source)
+    line: cython.Py_ssize_t = 1
+    line_start: cython.Py_ssize_t = 0
+    next_newline: cython.Py_ssize_t = find('\n')
+    if next_newline < 0:
+        next_newline = end
+    
+    while True:
+        match = match_token(source, pos)
+        if match is None:
+            break
+        index = match.lastindex
+        start = match.start(index)
+        pos = match.end()
+        while next_newline < start:
+            line += 1
+            line_start = next_newline + 1
+            next_newline = find('\n', line_start)
+            if next_newline < 0:
+                next_newline = end
         
-        if not match:
-            raise TokenizerError(f"Unexpected character: {source[pos]!r}", line, column)
+        tag = group_tags[index]
+        if tag is None:
+            # A comment: its text is never needed
+            continue
+        value = match.group(index)
+        if tag == 'word':
+            keyword = keywords.get(value)
+            if keyword is None:
+                # Identifiers are interned too: every use of a name then
+                # shares one string, and name lookups compare by identity
+                tag = 'identifier'
+                value = intern(value)
+            else:
+                tag, value = keyword
+        elif tag == 'operator':
+            tag = value = interned[value]
+        elif tag == 'identifier':
+            value = intern(value)
+        elif tag == 'number':
+            value = float(value) if '.' in value else int(value)
+        add_tag(tag)
+        add_value(value)
+        add_line(line)
+        add_column(start - line_start + 1)
+    
+    # Only skipped text may follow the last token
+    pos = SKIP_RE.match(source, pos).end()
+    if pos < end:
+        line += source.count('\n', line_start, pos)
+        column = pos - source.rfind('\n', 0, pos)
+        raise TokenizerError(f"Unexpected character: {source[pos]!r}", line, column)
     
     # Add end-of-file token
-    tokens.append(Token('EOF', '', line, column))
+    line += source.count('\n', line_start)
+    tokens.append('EOF', '', line, end - source.rfind('\n'))
     
     return tokens
 
 
-def tokenize_string(source: str) -> List[Token]:
+def tokenize_string(source: str) -> TokenStream:
     """Alias for tokenize() for backwards compatibility."""
     return tokenize(source)
 
@@ -152,9 +484,10 @@ def tokenize_string(source: str) -> List[Token]:
 # Test functions
 def test_tokenize_numbers():
     tokens = tokenize("42 3.14 .5")
-    assert tokens[0].tag == 'number' and tokens[0].value == '42'
-    assert tokens[1].tag == 'number' and tokens[1].value == '3.14'
-    assert tokens[2].tag == 'number' and tokens[2].value == '.5'
+    assert tokens[0].tag == 'number' and tokens[0].value == 42
+    assert tokens[1].tag == 'number' and tokens[1].value == 3.14
+    assert tokens[2].tag == 'number' and tokens[2].value == 0.5
+    assert type(tokens[0].value) is int and type(tokens[2].value) is float
     print("✓ test_tokenize_numbers passed")
 
 
@@ -180,6 +513,17 @@ def test_tokenize_keywords():
     print("✓ test_tokenize_keywords passed")
 
 
+def test_keyword_lookup():
+    tokens = tokenize("and or not iffy 5if")
+    assert [t.tag for t in tokens[:-1]] == ['&&', '||', '!', 'identifier', 'number', 'identifier']
+    assert tokens[0].value == 'and'
+    assert all(KEYWORD_TOKENS[text] == (tag, text) for text, tag in KEYWORDS.items())
+    tokens = tokenize("TRUE\u0663 if\u0663")
+    assert tokens.tags == ['identifier', 'number', 'identifier', 'number', 'EOF']
+    assert tokens.values[0] == 'TRUE' and tokens.values[2] == 'if'
+    print("✓ test_keyword_lookup passed")
+
+
 def test_tokenize_strings():
     tokens = tokenize('"hello" \'world\'')
     assert tokens[0].tag == 'string' and tokens[0].value == '"hello"'
@@ -198,11 +542,84 @@ def test_location_tracking():
     print("✓ test_location_tracking passed")
 
 
+def test_location_after_multiline_string():
+    tokens = tokenize('s = "a\nb"\ny = 1  ')
+    y_token = tokens[3]
+    assert (y_token.value, y_token.line, y_token.column) == ('y', 3, 1)
+    assert (tokens[-1].line, tokens[-1].column) == (3, 8)
+    print("✓ test_location_after_multiline_string passed")
+
+
+def test_unexpected_character():
+    try:
+        tokenize("x = 1\ny = @")
+        assert False, "Expected TokenizerError"
+    except TokenizerError as e:
+        assert (e.line, e.column) == (2, 5)
+        assert "Unexpected character: '@'" in str(e)
+    print("✓ test_unexpected_character passed")
+
+
+def test_token_slots():
+    token = tokenize("x")[0]
+    assert not hasattr(token, '__dict__')
+    assert token == Token('identifier', 'x', 1, 1) and token != Token('identifier', 'x', 1, 2)
+    print("✓ test_token_slots passed")
+
+
+def test_token_stream():
+    tokens = tokenize("x = 1\nprint x")
+    assert tokens.tags == ['identifier', '=', 'number', 'print', 'identifier', 'EOF']
+    assert list(tokens.lines) == [1, 1, 1, 2, 2, 2]
+    assert tokens[4] == Token('identifier', 'x', 2, 7)
+    assert list(tokens)[:2] == tokens[:2] == [Token('identifier', 'x', 1, 1), Token('=', '=', 1, 3)]
+    assert TokenStream.from_tokens(tokens).tags == tokens.tags
+    print("✓ test_token_stream passed")
+
+
+def test_interned_values():
+    tokens = tokenize("count == count_; count == x")
+    assert tokens.values[0] is tokens.values[4] and tokens.values[1] is tokens.values[5]
+    assert tokens.tags[1] is tokens.values[1]
+    print("✓ test_interned_values passed")
+
+
+def test_scan_kernel():
+    # Without Numba the kernel runs as plain Python; it must agree with the
+    # regular expression scanner, and bail on whatever it does not handle
+    for source in ["x = 5if 3.14 .5 7. # c\n  y>=1 && !z // d",
+                   "s = 'a\\'b\nc' + \"\u00e9\"\n\tprint s;", "", "\n\n  "]:
+        assert list(_tokenize_compiled(source)) == list(_tokenize_regex(source))
+    for source in ["x = \u0663", "x = 'open", "a & b", "s = 'a\\\nb'"]:
+        assert _tokenize_compiled(source) is None
+    print("✓ test_scan_kernel passed")
+
+
+def test_trailing_comment():
+    # A comment is never given back as a division, even with no token after it
+    assert tokenize("x = 4 // 2").tags == ['identifier', '=', 'number', 'EOF']
+    assert tokenize("x = 4 # 2\n").tags == ['identifier', '=', 'number', 'EOF']
+    try:
+        tokenize("x = 1 // c\n@")
+        assert False, "Expected TokenizerError"
+    except TokenizerError as e:
+        assert (e.line, e.column) == (2, 1)
+    print("✓ test_trailing_comment passed")
+
+
 if __name__ == "__main__":
     test_tokenize_numbers()
     test_tokenize_identifiers()
     test_tokenize_operators()
     test_tokenize_keywords()
+    test_keyword_lookup()
     test_tokenize_strings()
     test_location_tracking()
+    test_location_after_multiline_string()
+    test_unexpected_character()
+    test_token_slots()
+    test_token_stream()
+    test_interned_values()
+    test_scan_kernel()
+    test_trailing_comment()
     print("\nAll tokenizer tests passed!")